@@ -0,0 +1,36 @@
+"""unique fcm token
+
+Revision ID: 3b7e2f9a1c4d
+Revises: 8099c12bd3ed
+Create Date: 2025-07-28 11:42:10.512337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e2f9a1c4d'
+down_revision: Union[str, None] = '8099c12bd3ed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep only the most recent row for each token before enforcing uniqueness
+    op.execute("""
+        DELETE FROM fcm_tokens a
+        USING fcm_tokens b
+        WHERE a.token = b.token AND a.id < b.id
+    """)
+    op.drop_index(op.f('ix_fcm_tokens_token'), table_name='fcm_tokens')
+    op.create_index(op.f('ix_fcm_tokens_token'), 'fcm_tokens', ['token'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_fcm_tokens_token'), table_name='fcm_tokens')
+    op.create_index(op.f('ix_fcm_tokens_token'), 'fcm_tokens', ['token'], unique=False)
@@ -0,0 +1,31 @@
+"""fcm token active index
+
+Revision ID: 5d1c8e2b7a90
+Revises: 3b7e2f9a1c4d
+Create Date: 2025-07-28 15:06:37.281904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1c8e2b7a90'
+down_revision: Union[str, None] = '3b7e2f9a1c4d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_fcm_user_active', 'fcm_tokens', ['user_id'], unique=False,
+        postgresql_where=sa.text('is_active IS TRUE')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_fcm_user_active', table_name='fcm_tokens')
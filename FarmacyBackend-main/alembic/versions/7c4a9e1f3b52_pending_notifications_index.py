@@ -0,0 +1,38 @@
+"""pending notifications index
+
+Revision ID: 7c4a9e1f3b52
+Revises: 5d1c8e2b7a90
+Create Date: 2025-07-29 09:18:44.603215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4a9e1f3b52'
+down_revision: Union[str, None] = '5d1c8e2b7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_notifications_pending', 'user_notifications', ['scheduled_for'], unique=False,
+            postgresql_where=sa.text('sent_at IS NULL AND scheduled_for IS NOT NULL'),
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_user_notifications_pending', table_name='user_notifications',
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,34 @@
+"""users daily updates index
+
+Revision ID: a2e6d0c84f17
+Revises: 7c4a9e1f3b52
+Create Date: 2025-07-29 10:02:51.774630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2e6d0c84f17'
+down_revision: Union[str, None] = '7c4a9e1f3b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_users_daily_updates', 'users', ['id'], unique=False,
+        postgresql_where=sa.text(
+            "(notification_settings #>> '{notification_types,daily_updates}')::boolean "
+            "AND (notification_settings ->> 'push_notifications')::boolean"
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_daily_updates', table_name='users')
@@ -0,0 +1,41 @@
+"""users notification settings gin index
+
+Revision ID: e41b7d2c9f63
+Revises: a2e6d0c84f17
+Create Date: 2025-07-30 09:14:22.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41b7d2c9f63'
+down_revision: Union[str, None] = 'a2e6d0c84f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # notification_settings is a json column, so the GIN index is built on its jsonb cast
+    op.create_index(
+        'ix_users_notif_settings_gin', 'users',
+        [sa.text('(notification_settings::jsonb) jsonb_path_ops')],
+        unique=False, postgresql_using='gin'
+    )
+    op.drop_index('ix_users_daily_updates', table_name='users')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        'ix_users_daily_updates', 'users', ['id'], unique=False,
+        postgresql_where=sa.text(
+            "(notification_settings #>> '{notification_types,daily_updates}')::boolean "
+            "AND (notification_settings ->> 'push_notifications')::boolean"
+        )
+    )
+    op.drop_index('ix_users_notif_settings_gin', table_name='users')
@@ -76,6 +76,9 @@ class Settings(BaseSettings):
 
     OTP_EXPIRY_MINUTES: int = 5
     MAX_OTP_PER_DAY: int = 5
+
+    # Identical FCM sends to a token within this window are dropped (0 disables)
+    FCM_DEDUPE_WINDOW_SEC: int = 10
     
     model_config = SettingsConfigDict(
         env_file=str(BASE_DIR / ".env"),
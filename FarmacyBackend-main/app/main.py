@@ -2,6 +2,7 @@
 from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 import firebase_admin
 from firebase_admin import messaging, credentials
 import uvicorn
@@ -14,7 +15,10 @@ from app.core.config import settings
 from app.database import init_db, engine, Base
 from app.routes import auth_router, news_route, crop_routes, user_personalization, notification, firebase_auth_router, otp_router
 from app.services.scheduler import notification_scheduler
-from app.services.storage import init_supabase
+from app.services.storage import init_supabase, close_storage_http
+from app.services.fcm import close_fcm_http, warm_fcm_messaging_client
+from app.services.msg91_service import close_msg91_http
+from app.services.sms_service import close_sms_http
 from app.core.logger import logger
 
 @asynccontextmanager
@@ -35,6 +39,11 @@ async def lifespan(app: FastAPI):
             logger.error(f"Firebase initialization test failed: {str(test_error)}")
             raise
         logger.info("Firebase Admin SDK initialized successfully")
+        try:
+            warm_fcm_messaging_client()
+        except Exception as warm_error:
+            # Not fatal: the client is built lazily on the first send
+            logger.warning(f"Could not warm FCM messaging client: {str(warm_error)}")
     except (ValueError, FileNotFoundError) as e:
         logger.error(f"Firebase initialization error: {str(e)}")
         raise
@@ -70,6 +79,10 @@ async def lifespan(app: FastAPI):
         logger.info("Notification scheduler shut down")
 
         # Shutdown other services
+        await close_fcm_http()
+        await close_msg91_http()
+        await close_sms_http()
+        await close_storage_http()
         if firebase_admin._apps:
             firebase_admin.delete_app(firebase_admin.get_app())
             logger.info("Firebase Admin SDK shut down")
@@ -92,7 +105,8 @@ app = FastAPI(
     title="Farmacy",
     # version=settings.VERSION,
     # description=settings.DESCRIPTION,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS with more permissive settings for development
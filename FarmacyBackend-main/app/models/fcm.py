@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, Boolean, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, Boolean, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.database import Base
@@ -16,14 +16,20 @@ class FCMToken(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    token = Column(String(255), nullable=False, index=True)
+    token = Column(String(255), nullable=False, unique=True, index=True)
     device_type = Column(String(20))  # android, ios, web
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.now(timezone.utc))
     last_used_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
 
-    # Remove unique constraints to allow multiple tokens per user and token reuse
-    # The application logic will handle duplicate prevention
+    # A user may hold many tokens, but each token belongs to exactly one user.
+    # register_token upserts on the unique token and reassigns it to the new owner.
+
+    # (user_id, token) lookups are served by the unique token index; the active-token
+    # queries used by topic subscriptions get a partial index
+    __table_args__ = (
+        Index('ix_fcm_user_active', 'user_id', postgresql_where=text('is_active IS TRUE')),
+    )
 
     user = relationship("User", back_populates="fcm_tokens")
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Boolean, Enum, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -36,6 +36,16 @@ class UserNotification(Base):
 
     user = relationship("User", back_populates="notifications")
 
+    # Only unsent scheduled notifications are scanned by the scheduler, so the
+    # index stays small no matter how much notification history accumulates
+    __table_args__ = (
+        Index(
+            'ix_user_notifications_pending',
+            'scheduled_for',
+            postgresql_where=text('sent_at IS NULL AND scheduled_for IS NOT NULL')
+        ),
+    )
+
 class NotificationTemplate(Base):
     __tablename__ = "notification_templates"
 
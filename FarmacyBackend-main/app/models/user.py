@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey, Text, Index, text
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.dialects.postgresql import JSON
 from sqlalchemy.orm import relationship
@@ -7,6 +7,13 @@ from datetime import datetime, timezone
 
 from app.database import Base
 
+# Daily-update opt-in check as a JSONB containment test. Queries must use this exact
+# expression so the planner can match the GIN index on users.notification_settings.
+DAILY_UPDATES_SUBSCRIBED_SQL = (
+    "(notification_settings::jsonb) @> "
+    "'{\"push_notifications\": true, \"notification_types\": {\"daily_updates\": true}}'::jsonb"
+)
+
 class UserLoginHistory(Base):
     __tablename__ = "user_login_history"
 
@@ -74,5 +81,13 @@ class User(Base):
     subscribed_topics = relationship("NotificationTopic", secondary="user_topic_subscriptions", back_populates="subscribers")
     login_history = relationship("UserLoginHistory", back_populates="user", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index(
+            'ix_users_notif_settings_gin',
+            text("(notification_settings::jsonb) jsonb_path_ops"),
+            postgresql_using='gin'
+        ),
+    )
+
     def __repr__(self):
         return f"<User {self.username}>"
\ No newline at end of file
@@ -103,6 +103,40 @@ def clear_all_cache():
         print(f"Redis flush error: {str(e)}")
         return False
 
+def set_if_absent(key: str, ttl: int) -> bool:
+    """
+    Atomically set a marker key if it does not exist yet (SET NX EX).
+
+    Args:
+        key: Redis key for the marker
+        ttl: Time-to-live in seconds
+
+    Returns:
+        True if the key was set, False if it already existed. Fails open
+        (returns True) when Redis is unavailable.
+    """
+    try:
+        return bool(redis_client.set(key, "1", nx=True, ex=ttl))
+    except Exception as e:
+        logger.error(f"Redis set-if-absent error: {str(e)}")
+        return True
+
+def delete_key(key: str) -> bool:
+    """
+    Delete a single key, e.g. to release a set_if_absent marker.
+
+    Args:
+        key: Redis key to delete
+
+    Returns:
+        True if the key existed and was deleted, False otherwise
+    """
+    try:
+        return bool(redis_client.delete(key))
+    except Exception as e:
+        logger.error(f"Redis delete error: {str(e)}")
+        return False
+
 def increment_counter(key: str, ttl: int = 86400) -> int:
     """
     Increment a counter in Redis and set expiry if not exists.
@@ -21,6 +21,7 @@ from app.dependencies.auth import get_current_active_user, get_current_user
 from app.models.user import User, UserLoginHistory
 from app.schemas.user import UserCreate, UserRead, UserLogin, Token
 from app.services.fcm import FCMService
+from app.services.msg91_service import invalidate_verification_cache
 from app.core.logger import logger
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -212,6 +213,8 @@ async def logout(
         current_user.refresh_token = None
         current_user.refresh_token_expires_at = None
         db.commit()
+        if current_user.phone_number:
+            invalidate_verification_cache(current_user.phone_number)
 
         # Run unregistration and history update in background
         background_tasks.add_task(run_logout_cleanup, current_user.id)
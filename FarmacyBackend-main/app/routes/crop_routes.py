@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile, Form, Request
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.dependencies.auth import get_current_user
@@ -12,12 +13,34 @@ from app.schemas.crop import (
     StageResponse,
     DiseaseResponse,
     CropListResponse,
+    CROP_LIST_ADAPTER,
 )
 from app.core.cache import cache_response, clear_related_caches, CROP_CACHE_PATTERNS
 from datetime import datetime
 
 router = APIRouter(prefix="/crops", tags=["crops"])
 
+# Returns the number of crops in the page and the translated rows as JSON. Crops
+# without a translation in the language are left out, so the JSON can be '[]'
+# for a non-empty page.
+_CROP_LIST_SQL = text("""
+    WITH page AS (
+        SELECT id, code, image_urls FROM crops ORDER BY id OFFSET :skip LIMIT :limit
+    )
+    SELECT
+        (SELECT count(*) FROM page),
+        COALESCE((
+            SELECT json_agg(t)
+            FROM (
+                SELECT c.id, c.code, ct.name, c.image_urls, ct.cultivated_in,
+                       ct.variety, ct.description, ct.cultivation_overview
+                FROM page c
+                JOIN crop_translations ct ON ct.crop_id = c.id AND ct.language = :lang
+                ORDER BY c.id
+            ) t
+        ), '[]')::text
+""")
+
 @router.get("/", response_model=List[CropListResponse])
 @cache_response(ttl=3600, key_prefix="crops")  # Cache for 1 hour
 async def get_all_crops(
@@ -32,30 +55,13 @@ async def get_all_crops(
     if lang is None:
         lang = current_user.preferred_language
         
-    crops = db.query(Crop).offset(skip).limit(limit).all()
-    if not crops:
+    # Postgres aggregates the page into a single JSON document so the rows can be
+    # validated straight from bytes instead of walking ORM attributes
+    crop_count, raw = db.execute(_CROP_LIST_SQL, {"lang": lang, "skip": skip, "limit": limit}).one()
+    if not crop_count:
         raise HTTPException(status_code=404, detail="No crops found")
 
-    result = []
-    for crop in crops:
-        translation = db.query(CropTranslation).filter(
-            CropTranslation.crop_id == crop.id,
-            CropTranslation.language == lang
-        ).first()
-
-        if translation:
-            result.append({
-                "id": crop.id,
-                "code": crop.code,
-                "name": translation.name,
-                "image_urls": crop.image_urls,
-                "cultivated_in": translation.cultivated_in,
-                "variety": translation.variety,
-                "description": translation.description,
-                "cultivation_overview": translation.cultivation_overview
-            })
-
-    return result
+    return CROP_LIST_ADAPTER.validate_json(raw)
 
 
 @router.get("/id/{crop_id}", response_model=CropResponse)
@@ -13,7 +13,7 @@ import json
 import urllib
 from app.models.news import NewsArticle
 from fastapi import APIRouter, Depends, HTTPException, status, Request , Query
-from app.schemas.news_schema import NewsRead
+from app.schemas.news_schema import NEWS_LIST_ADAPTER, NewsRead
 from app.core.config import IST_TIME, settings
 from app.database import get_db
 from app.dependencies.auth import get_current_user
@@ -131,7 +131,7 @@ async def get_news(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No news found"
         )
-    return [NewsRead.model_validate(n) for n in news]
+    return NEWS_LIST_ADAPTER.validate_python(news, from_attributes=True)
 
 @router.get("/get_news/{news_id}", response_model=NewsRead)
 @cache_response(ttl=3600, key_prefix="news_by_id")  # Cache for 1 hour
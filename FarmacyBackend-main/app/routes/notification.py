@@ -1,4 +1,4 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timezone, timedelta
@@ -19,7 +19,8 @@ from app.schemas.notification import (
     TopicBroadCastMessage,
     TopicCreate,
     TopicResponse,
-    NotificationSettingsUpdate
+    NotificationSettingsUpdate,
+    dump_notification_list
 )
 from app.dependencies.auth import get_current_user
 from app.core.logger import logger
@@ -40,10 +41,10 @@ async def create_notification(
         db_notification = await NotificationService.create_and_send_notification(
             db=db,
             user_id=current_user.id,
-            type=notification.type,
+            type=NotificationType(notification.type),
             title=notification.title,
             message=notification.message,
-            priority=notification.priority,
+            priority=NotificationPriority(notification.priority),
             data=notification.data,
             scheduled_for=notification.scheduled_at.astimezone(
                 IST_TIME) if notification.scheduled_at else None,
@@ -71,7 +72,7 @@ async def get_notifications(
         type=type,
         unread_only=unread_only
     )
-    return notifications
+    return Response(content=dump_notification_list(notifications), media_type="application/json")
 
 
 @router.patch("/{notification_id}/read")
@@ -112,14 +113,16 @@ async def send_test_notification(
 ): 
     """Send an immediate test notification."""
     try:
+        now = datetime.now(IST_TIME)
         await NotificationService.create_and_send_notification(
             db=db,
             user_id=current_user.id,
             type=NotificationType.SYSTEM_ALERT,
             priority=NotificationPriority.MEDIUM,
             title="Test Notification",
-            message=f"Test notification sent at {datetime.now(IST_TIME).strftime('%H:%M:%S')}",
+            message=f"Test notification sent at {now.strftime('%H:%M:%S')}",
             data={"test": True},
+            now=now,
         )
         return {"message": "Test notification sent successfully"}
     except Exception as e:
@@ -134,7 +137,8 @@ async def schedule_test_notification(
 ):
     """Schedule a test notification for the future."""
     try:
-        scheduled_time = datetime.now(IST_TIME) + timedelta(minutes=minutes)
+        now = datetime.now(IST_TIME)
+        scheduled_time = now + timedelta(minutes=minutes)
         await NotificationService.create_and_send_notification(
             db=db,
             user_id=current_user.id,
@@ -143,7 +147,8 @@ async def schedule_test_notification(
             message=f"This notification was scheduled for {scheduled_time.strftime('%H:%M:%S')}",
             priority=NotificationPriority.MEDIUM,
             data={"test": True, "scheduled": True},
-            scheduled_for=scheduled_time
+            scheduled_for=scheduled_time,
+            now=now
         )
         return {"message": f"Test notification scheduled for {scheduled_time.strftime('%H:%M:%S')}"}
     except Exception as e:
@@ -215,15 +220,9 @@ async def get_active_test_jobs(
     try:
         is_test_user = current_user.id in notification_scheduler.test_users
 
-        # Get all jobs for this user
-        jobs = []
-        if is_test_user:
-            all_jobs = notification_scheduler.get_scheduled_jobs()
-            user_job_ids = [
-                f'test_notifications_{current_user.id}',
-                f'test_updates_{current_user.id}'
-            ]
-            jobs = [job for job in all_jobs if job["id"] in user_job_ids]
+        # Get the test job for this user
+        test_job = notification_scheduler.get_test_job(current_user.id)
+        jobs = [test_job] if test_job else []
 
         return {
             "active": is_test_user,
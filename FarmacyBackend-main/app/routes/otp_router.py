@@ -24,7 +24,7 @@ async def verify_access_token(
 ):
     """Verify MSG91 access token and return user status"""
     try:
-        result = msg91_service.verify_access_token(db, request)
+        result = await msg91_service.verify_access_token(db, request)
         return result
     except ValueError as e:
         raise HTTPException(
@@ -144,8 +144,8 @@ async def predict_crop_disease(
         10. Include organic and chemical treatment options
         11. Respond ONLY with raw JSON, no markdown formatting"""
 
-        # Generate response
-        response = model.generate_content([prompt, pil_image])
+        # Generate response off the event loop; the Gemini SDK call is blocking
+        response = await asyncio.to_thread(model.generate_content, [prompt, pil_image])
         analysis_text = response.text
 
         try:
@@ -318,7 +318,8 @@ STRICT CONTENT POLICY:
         logger.info(f"Preparing chatbot request with language: {language}")
         
         # Call Groq API with enhanced language instructions
-        completion = client.chat.completions.create(
+        completion = await asyncio.to_thread(
+            client.chat.completions.create,
             messages=[
                 {
                     "role": "system",
@@ -413,7 +414,8 @@ async def get_fertilizer_recommendations(
 
         client = groq.Groq(api_key=settings.GROQ_API_KEY)
 
-        completion = client.chat.completions.create(
+        completion = await asyncio.to_thread(
+            client.chat.completions.create,
             messages=[
                 {
                     "role": "user",
@@ -788,7 +790,7 @@ async def get_weather_forecast_by_coordinates(
             # logger.info("Geo data: %s", geo_data)
 
             if not geo_data:
-                location = LocationDetails(
+                location = LocationDetails.model_construct(
                     name="Unknown",
                     country="Unknown",
                     state=None,
@@ -797,7 +799,7 @@ async def get_weather_forecast_by_coordinates(
                 )
             else:
                 location_data = geo_data[0]
-                location = LocationDetails(
+                location = LocationDetails.model_construct(
                     name=location_data.get("name", "Unknown"),
                     country=location_data.get("country", "Unknown"),
                     state=location_data.get("state"),
@@ -828,7 +830,7 @@ async def get_weather_forecast_by_coordinates(
                         "icons": []  # Store icons for daily summary
                     }
 
-                hourly_data = HourlyForecast(
+                hourly_data = HourlyForecast.model_construct(
                     time=time,
                     temperature=round(temp, 2),
                     humidity=item["main"]["humidity"],
@@ -866,7 +868,7 @@ async def get_weather_forecast_by_coordinates(
                 daily_icon_url = f"https://openweathermap.org/img/wn/{most_common_icon}@2x.png" if most_common_icon else None
 
                 formatted_forecasts.append(
-                    DailyForecast(
+                    DailyForecast.model_construct(
                         date=date,
                         temperature={
                             "day": round(sum(temp_day) / len(temp_day), 2) if temp_day else None,
@@ -875,12 +877,12 @@ async def get_weather_forecast_by_coordinates(
                             "max": round(max(temp_day + temp_night), 2) if (temp_day + temp_night) else None
                         },
                         humidity=round(
-                            sum(data["humidity"]) / len(data["humidity"]), 2),
+                            sum(data["humidity"]) / len(data["humidity"])),
                         wind_speed=round(
                             sum(data["wind_speed"]) / len(data["wind_speed"]), 2),
                         # Added pressure
                         pressure=round(
-                            sum(data["pressure"]) / len(data["pressure"]), 2),
+                            sum(data["pressure"]) / len(data["pressure"])),
                         description=", ".join(data["description"]),
                         hourly_forecast=sorted(
                             data["hourly_data"], key=lambda x: x.time),
@@ -891,7 +893,7 @@ async def get_weather_forecast_by_coordinates(
 
             formatted_forecasts.sort(key=lambda x: x.date)
 
-            return WeatherForecast(
+            return WeatherForecast.model_construct(
                 coordinates={"lat": lat, "lon": lon},
                 location=location,
                 forecast_interval_hours=FORECAST_INTERVAL_HOURS,
@@ -0,0 +1,10 @@
+from pydantic import ConfigDict
+
+# Shared config for read models built from ORM rows. Spelling out the defaults keeps
+# every schema on the same validator settings instead of per-class Config shims.
+FAST_ORM_CONFIG = ConfigDict(
+    from_attributes=True,
+    extra='ignore',
+    populate_by_name=False,
+    revalidate_instances='never'
+)
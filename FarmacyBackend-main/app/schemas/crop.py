@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, SkipValidation, TypeAdapter
 from typing import List, Optional, Dict, Any
 
 class CropListResponse(BaseModel):
@@ -11,6 +11,8 @@ class CropListResponse(BaseModel):
     cultivation_overview: Optional[str]
     image_urls: Optional[List[str]] = None
 
+CROP_LIST_ADAPTER = TypeAdapter(List[CropListResponse])
+
 class CropResponse(BaseModel):
     id: int
     code: str
@@ -21,24 +23,18 @@ class CropResponse(BaseModel):
     cultivation_overview: Optional[str]
     image_urls: Optional[List[str]]
 
-class WeekResponse(BaseModel):
-    week_number: int
-    title: str
-    day_range: Optional[str]
-    days: Dict[str, Any]
-    image_urls: Optional[List[str]]
-    video_urls: Optional[List[str]]
-    stage_id: Optional[int]
-    stage: Optional[Dict[str, Any]] = None
-
 class StageWeekResponse(BaseModel):
     week_number: int
     title: str
     day_range: Optional[str]
-    days: Dict[str, Any]
+    days: SkipValidation[Dict[str, Any]]  # Stored JSON, passed through as-is
     image_urls: Optional[List[str]]
     video_urls: Optional[List[str]]
 
+class WeekResponse(StageWeekResponse):
+    stage_id: Optional[int] = None
+    stage: Optional[Dict[str, Any]] = None
+
 class StageResponse(BaseModel):
     stage_number: int
     title: str
@@ -50,7 +46,7 @@ class DiseaseResponse(BaseModel):
     id: int
     name: str
     type: str
-    description: Dict[str, Any]
+    description: SkipValidation[Dict[str, Any]]
     image_urls: Optional[List[str]] 
 
 class DiseaseListResponse(BaseModel):
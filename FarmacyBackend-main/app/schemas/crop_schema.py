@@ -1,9 +1,12 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, computed_field, field_validator
+from app.schemas._config import FAST_ORM_CONFIG
+from typing import Dict, List, Literal, Optional, Union
 from uuid import UUID
 from datetime import datetime
 import re
 
+_DAY_RANGE_RE = re.compile(r"Days \d+–\d+$")
+
 class DayData(BaseModel):
     tasks: List[str]
     notes: Optional[List[str]] = None
@@ -17,41 +20,33 @@ class WeekDataCreate(BaseModel):
 
     @field_validator("day_range")
     def validate_day_range(cls, v):
-        if not re.match(r"Days \d+–\d+$", v):
+        if not _DAY_RANGE_RE.match(v):
             raise ValueError("day_range must be in format 'Days X–Y'")
         return v
 
 class WeekDataResponse(WeekDataCreate):
     id: UUID
     crop_id: UUID
-    language: str
+    language: Literal["en", "te", "hi"]
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = FAST_ORM_CONFIG
 
 class CropTranslationCreate(BaseModel):
-    language: str = Field(..., max_length=10, description="Language code (e.g., 'en', 'te', 'hi')")
+    language: Literal["en", "te", "hi"] = Field(..., description="Language code (e.g., 'en', 'te', 'hi')")
     name: str = Field(..., max_length=100)
     variety: str = Field(..., max_length=100)
     description: Optional[str] = None
     cultivation_overview: Optional[str] = None
 
-    @field_validator("language")
-    def validate_language(cls, v):
-        if v not in {"en", "te", "hi"}:
-            raise ValueError("Language must be 'en', 'te', or 'hi'")
-        return v
-
 class CropTranslationResponse(CropTranslationCreate):
     id: UUID
     crop_id: UUID
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = FAST_ORM_CONFIG
 
 class CropCreate(BaseModel):
     code: str = Field(..., max_length=50)
@@ -73,20 +68,22 @@ class CropResponse(BaseModel):
     id: UUID
     code: str
     cultivated_in: Optional[str]
-    image_paths: Optional[str]
+    # Read from the ORM's image_paths (list or already comma-joined) and emitted as a
+    # comma-separated string by the computed field below
+    image_path_source: Optional[Union[List[str], str]] = Field(None, validation_alias="image_paths", exclude=True)
     created_at: datetime
     updated_at: datetime
     translations: List[CropTranslationResponse]
     weeks: List[WeekDataResponse]
 
-    class Config:
-        from_attributes = True
+    model_config = FAST_ORM_CONFIG
 
-    @field_validator("image_paths")
-    def split_image_paths(cls, v):
-        if isinstance(v, list):
-            return ",".join(v) if v else None
-        return v
+    @computed_field
+    @property
+    def image_paths(self) -> Optional[str]:
+        if isinstance(self.image_path_source, list):
+            return ",".join(self.image_path_source) if self.image_path_source else None
+        return self.image_path_source
 
 class CropUpdate(BaseModel):
     code: Optional[str] = Field(None, max_length=50)
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, TypeAdapter
+from app.schemas._config import FAST_ORM_CONFIG
 from datetime import datetime
 from typing import List, Optional
 
@@ -17,5 +18,7 @@ class NewsRead(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FAST_ORM_CONFIG
 
+
+NEWS_LIST_ADAPTER = TypeAdapter(List[NewsRead])
@@ -1,19 +1,46 @@
 import re
-from pydantic import BaseModel, Field, ValidationInfo, field_validator
-from typing import Optional, Dict, Any, List
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationInfo, field_validator
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime, time
 from enum import Enum
+from zoneinfo import available_timezones
 from app.core.config import IST_TIME
-from app.models.notification import NotificationType, NotificationPriority
+from app.schemas._config import FAST_ORM_CONFIG
+from app.models.notification import NotificationPriority
+
+# Literal mirrors of the notification enums: pydantic validates these without the
+# enum lookup, and the DB layer converts back with NotificationType(value) etc.
+NotificationTypeLiteral = Literal[
+    "daily_update", "disease_alert", "weather_alert", "market_update", "news_alert", "system_alert"
+]
+NotificationPriorityLiteral = Literal["low", "medium", "high", "urgent"]
+NotificationFrequencyLiteral = Literal["instant", "hourly", "daily", "weekly", "never"]
+
+
+@lru_cache(maxsize=1)
+def _known_timezones() -> frozenset:
+    return frozenset(available_timezones())
+
+
+FCM_TOPIC_REGEX = re.compile(r'^[a-zA-Z0-9\-_.~%]+$')
+
+
+def _validate_fcm_topic(value: Optional[str]) -> Optional[str]:
+    if value is not None and not FCM_TOPIC_REGEX.fullmatch(value):
+        raise ValueError(
+            "Topic name can only contain letters, numbers, hyphens (-), underscores (_), dots (.), tildes (~), and percent signs (%)"
+        )
+    return value
 
 
 class NotificationBase(BaseModel):
-    type: NotificationType
+    type: NotificationTypeLiteral
     title: str = Field(..., min_length=1, max_length=255)
     message: str = Field(..., min_length=1, max_length=1000)
-    priority: NotificationPriority = NotificationPriority.MEDIUM
+    priority: NotificationPriorityLiteral = NotificationPriority.MEDIUM.value
     data: Optional[Dict[str, Any]] = None
-    language: Optional[str] = Field(None, pattern=r'^[a-z]{2}(-[A-Z]{2})?$')  # ISO language codes
+    language: Optional[str] = Field(None, max_length=5, pattern=r'^[a-z]{2}(-[A-Z]{2})?$')  # ISO language codes
     expires_at: Optional[datetime] = None
     scheduled_at: Optional[datetime] = None
 
@@ -33,11 +60,13 @@ class NotificationCreate(NotificationBase):
 class NotificationUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=255)
     message: Optional[str] = Field(None, min_length=1, max_length=1000)
-    priority: Optional[NotificationPriority] = None
+    priority: Optional[NotificationPriorityLiteral] = None
     data: Optional[Dict[str, Any]] = None
     expires_at: Optional[datetime] = None
     scheduled_at: Optional[datetime] = None
 
+    model_config = ConfigDict(defer_build=True)
+
 
 class NotificationResponse(NotificationBase):
     id: int
@@ -51,47 +80,48 @@ class NotificationResponse(NotificationBase):
     retry_count: int = 0
     error_message: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = FAST_ORM_CONFIG
+
+
+NOTIFICATION_LIST_ADAPTER = TypeAdapter(List[NotificationResponse])
+
+
+def dump_notification_list(notifications) -> bytes:
+    """Serialize ORM notifications straight to JSON bytes with the shared adapter."""
+    return NOTIFICATION_LIST_ADAPTER.dump_json(
+        NOTIFICATION_LIST_ADAPTER.validate_python(notifications, from_attributes=True)
+    )
 
 
 class NotificationMarkRead(BaseModel):
     notification_ids: List[int] = Field(..., min_items=1)
 
+    model_config = ConfigDict(defer_build=True)
+
 
 class NotificationBulkAction(BaseModel):
     notification_ids: List[int] = Field(..., min_items=1)
     action: str = Field(..., pattern=r'^(mark_read|mark_unread|delete)$')
 
+    model_config = ConfigDict(defer_build=True)
+
 
-FCM_TOPIC_REGEX = re.compile(r'^[a-zA-Z0-9\-_.~%]+$')
 class TopicBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
     description: str = Field(..., min_length=1, max_length=500)
     type: str = Field(..., min_length=1, max_length=50)
     is_active: bool = True
 
-    @field_validator("name")
-    def validate_topic_name(cls, value):
-        if not FCM_TOPIC_REGEX.fullmatch(value):
-            raise ValueError(
-                "Topic name can only contain letters, numbers, hyphens (-), underscores (_), dots (.), tildes (~), and percent signs (%)"
-            )
-        return value
+    validate_topic_name = field_validator("name")(_validate_fcm_topic)
 
 
 class TopicCreate(TopicBase):
     pass
 
 class SubscribeTopicInput(BaseModel):
-    name: str = Field(...,max_length=100, pattern=r'^[a-zA-Z0-9-_.~%]+$')
-    @field_validator("name")
-    def validate_topic_name(cls, value):
-        if not FCM_TOPIC_REGEX.fullmatch(value):
-            raise ValueError(
-                "Topic name can only contain letters, numbers, hyphens (-), underscores (_), dots (.), tildes (~), and percent signs (%)"
-            )
-        return value
+    name: str = Field(..., max_length=100)
+
+    validate_topic_name = field_validator("name")(_validate_fcm_topic)
 
 
 class TopicUpdate(BaseModel):
@@ -99,13 +129,10 @@ class TopicUpdate(BaseModel):
     description: Optional[str] = Field(None, min_length=1, max_length=500)
     type: Optional[str] = Field(None, min_length=1, max_length=50)
     is_active: Optional[bool] = None
-    @field_validator("name")
-    def validate_topic_name(cls, value):
-        if not FCM_TOPIC_REGEX.fullmatch(value):
-            raise ValueError(
-                "Topic name can only contain letters, numbers, hyphens (-), underscores (_), dots (.), tildes (~), and percent signs (%)"
-            )
-        return value
+    validate_topic_name = field_validator("name")(_validate_fcm_topic)
+
+    model_config = ConfigDict(defer_build=True)
+
 
 class TopicResponse(TopicBase):
     id: int
@@ -113,8 +140,7 @@ class TopicResponse(TopicBase):
     updated_at: Optional[datetime] = None
     subscriber_count: int = 0
 
-    class Config:
-        from_attributes = True
+    model_config = FAST_ORM_CONFIG
 
 
 class NotificationFrequency(str, Enum):
@@ -130,19 +156,24 @@ class NotificationSettingsBase(BaseModel):
     sms_notifications: bool = False
     push_notifications: bool = True
     notification_types: Dict[str, bool] = Field(default_factory=dict)
-    notification_frequency: NotificationFrequency = NotificationFrequency.INSTANT
+    notification_frequency: NotificationFrequencyLiteral = NotificationFrequency.INSTANT.value
     quiet_hours_start: Optional[time] = None
     quiet_hours_end: Optional[time] = None
-    timezone: Optional[str] = Field(None, pattern=r'^[A-Za-z_]+/[A-Za-z_]+$')  # e.g., "America/New_York"
+    timezone: Optional[str] = Field(None, max_length=64)  # e.g., "America/New_York"
+
+    @field_validator('timezone')
+    def validate_timezone(cls, v):
+        if v is not None and v not in _known_timezones():
+            raise ValueError('timezone must be a valid IANA timezone name')
+        return v
     
     @field_validator('quiet_hours_end')
     def validate_quiet_hours(cls, v, info: ValidationInfo):
-        quiet_hours_start = info.data.get('quiet_hours_start')
-        if v and quiet_hours_start:
-            # Allow overnight quiet hours (e.g., 22:00 to 06:00)
-            return v
-        else:
+        # Overnight quiet hours (e.g., 22:00 to 06:00) are allowed, so only the
+        # presence of a start time is checked
+        if v and not info.data.get('quiet_hours_start'):
             raise ValueError('quiet_hours_start must be set if quiet_hours_end is provided')
+        return v
 
 
 class NotificationSettingsUpdate(NotificationSettingsBase):
@@ -150,7 +181,7 @@ class NotificationSettingsUpdate(NotificationSettingsBase):
     sms_notifications: Optional[bool] = None
     push_notifications: Optional[bool] = None
     notification_types: Optional[Dict[str, bool]] = None
-    notification_frequency: Optional[NotificationFrequency] = None
+    notification_frequency: Optional[NotificationFrequencyLiteral] = None
 
 
 class NotificationSettingsResponse(NotificationSettingsBase):
@@ -159,8 +190,7 @@ class NotificationSettingsResponse(NotificationSettingsBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(**FAST_ORM_CONFIG, defer_build=True)
 
 
 class UserTopicSubscription(BaseModel):
@@ -169,13 +199,14 @@ class UserTopicSubscription(BaseModel):
     subscribed_at: datetime
     is_active: bool = True
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(**FAST_ORM_CONFIG, defer_build=True)
 
 
 class TopicSubscriptionRequest(BaseModel):
     topic_ids: List[int] = Field(..., min_items=1)
 
+    model_config = ConfigDict(defer_build=True)
+
 
 class NotificationStats(BaseModel):
     total_notifications: int = 0
@@ -184,6 +215,8 @@ class NotificationStats(BaseModel):
     notifications_by_type: Dict[str, int] = Field(default_factory=dict)
     notifications_by_priority: Dict[str, int] = Field(default_factory=dict)
 
+    model_config = ConfigDict(defer_build=True)
+
 
 class NotificationListResponse(BaseModel):
     notifications: List[NotificationResponse]
@@ -194,16 +227,13 @@ class NotificationListResponse(BaseModel):
     has_next: bool = False
     has_previous: bool = False
 
+    model_config = ConfigDict(defer_build=True)
+
+
 class TopicBroadCastMessage(BaseModel):
     topic_name: str = Field(..., max_length=100)
     title: str = Field(..., max_length=100)
     message: str = Field(..., max_length=500)
     data: Optional[Dict[str, Any]]
 
-    @field_validator("topic_name")
-    def validate_topic_name(cls, value):
-        if not FCM_TOPIC_REGEX.fullmatch(value):
-            raise ValueError(
-                "Topic name can only contain letters, numbers, hyphens (-), underscores (_), dots (.), tildes (~), and percent signs (%)"
-            )
-        return value
\ No newline at end of file
+    validate_topic_name = field_validator("topic_name")(_validate_fcm_topic)
\ No newline at end of file
@@ -0,0 +1,5 @@
+from typing import Annotated
+from pydantic import StringConstraints
+
+# Shared annotated types so every schema reuses the same constraint metadata
+Password = Annotated[str, StringConstraints(min_length=8)]
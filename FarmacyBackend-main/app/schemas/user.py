@@ -1,18 +1,40 @@
+import re
 from datetime import datetime
 from typing import Dict, Optional
 from uuid import UUID
-from pydantic import BaseModel, EmailStr, constr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from app.schemas.types import Password
+from app.schemas._config import FAST_ORM_CONFIG
+
+# RFC 5321 caps an address at 254 characters; rejecting longer input up front keeps
+# the email-validator regex away from pathological strings.
+EMAIL_MAX_LENGTH = 254
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def _cap_email_length(value):
+    if isinstance(value, str) and len(value) > EMAIL_MAX_LENGTH:
+        raise ValueError(f"email must be at most {EMAIL_MAX_LENGTH} characters")
+    return value
+
+
+def _check_email_format(value: Optional[str]) -> Optional[str]:
+    if value is not None and not _EMAIL_RE.match(value):
+        raise ValueError("value is not a valid email address")
+    return value
 
 class UserBase(BaseModel):
     username: str
-    email: Optional[EmailStr] = None  # Made optional for phone-only auth
+    email: Optional[str] = Field(None, max_length=EMAIL_MAX_LENGTH)  # Made optional for phone-only auth
     phone_number: Optional[str] = None
     farm_type: Optional[str] = None
 
 
 class UserCreate(UserBase):
     email: EmailStr  # Still required for traditional signup
-    password: constr(min_length=8)
+    password: Password
+
+    cap_email_length = field_validator("email", mode="before")(_cap_email_length)
 
 
 class FirebaseUserCreate(BaseModel):
@@ -39,16 +61,16 @@ class UserRead(BaseModel):
     notification_settings: Dict
     created_at: datetime
     updated_at: datetime
-    current_crop_tracking_id: Optional[int] = None
 
-    class Config:
-        from_attributes = True
+    model_config = FAST_ORM_CONFIG
 
 
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+    cap_email_length = field_validator("email", mode="before")(_cap_email_length)
+
 
 class FirebasePhoneLogin(BaseModel):
     """Schema for Firebase phone authentication (login/signup)"""
@@ -61,12 +83,14 @@ class FirebasePhoneLogin(BaseModel):
 
 class UserUpdate(BaseModel):
     username: Optional[str] = None
-    email: Optional[EmailStr] = None
-    password: Optional[constr(min_length=8)] = None
+    email: Optional[str] = Field(None, max_length=EMAIL_MAX_LENGTH)
+    password: Optional[Password] = None
     phone_number: Optional[str] = None
     farm_type: Optional[str] = None
     current_crop_tracking_id: Optional[int] = None
 
+    check_email_format = field_validator("email")(_check_email_format)
+
 
 class Token(BaseModel):
     access_token: str
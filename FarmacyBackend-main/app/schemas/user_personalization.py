@@ -1,5 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, SkipValidation
+from app.schemas._config import FAST_ORM_CONFIG
 from typing import List, Optional, Dict, Any
+from typing_extensions import TypedDict
 from datetime import date, datetime
 
 class DiseaseInfo(BaseModel):
@@ -22,9 +24,7 @@ class DiseasePredictionResponse(BaseModel):
     general_recommendations: List[str] = Field(default_factory=list)
     analysis: str
 
-    model_config = {
-        "from_attributes": True
-    }
+    model_config = FAST_ORM_CONFIG
 
 class DiseasePredictionHistoryResponse(BaseModel):
     id: int
@@ -32,30 +32,24 @@ class DiseasePredictionHistoryResponse(BaseModel):
     crop_name: Optional[str]
     query: Optional[str]
     image_url: Optional[str]
-    prediction_result: Dict[str, Any]
+    prediction_result: SkipValidation[Dict[str, Any]]  # Stored JSON, passed through as-is
     created_at: datetime
 
-    model_config = {
-        "from_attributes": True
-    }
+    model_config = FAST_ORM_CONFIG
 
 class NotificationPreferences(BaseModel):
     daily_updates: bool = True
     disease_alerts: bool = True
     weather_alerts: bool = True
 
-    model_config = {
-        "from_attributes": True
-    }
+    model_config = FAST_ORM_CONFIG
 
 class UserCropTrackingCreate(BaseModel):
     crop_id: int
     start_date: date
     notification_preferences: Optional[NotificationPreferences] = None
 
-    model_config = {
-        "from_attributes": True
-    }
+    model_config = FAST_ORM_CONFIG
 
 class UserCropTrackingResponse(BaseModel):
     id: int
@@ -67,14 +61,12 @@ class UserCropTrackingResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    model_config = {
-        "from_attributes": True
-    }
+    model_config = FAST_ORM_CONFIG
 
-class DayData(BaseModel):
-    tasks: List[Optional[str]] = []
-    notes: List[Optional[str]] = []
-    recommendations: List[Optional[str]] = []
+class DayData(TypedDict, total=False):
+    tasks: List[Optional[str]]
+    notes: List[Optional[str]]
+    recommendations: List[Optional[str]]
 
 class DailyCropUpdate(BaseModel):
     tracking_id: int
@@ -83,11 +75,9 @@ class DailyCropUpdate(BaseModel):
     days: Dict[str, DayData]  # Map of day_number to day data
     title: str
     alerts: Optional[List[str]] = Field(default_factory=list)
-    weather_info: Dict[str, Any] = Field(default_factory=dict)
+    weather_info: SkipValidation[Dict[str, Any]] = Field(default_factory=dict)
 
-    model_config = {
-        "from_attributes": True
-    }
+    model_config = FAST_ORM_CONFIG
 
 class HourlyForecast(BaseModel):
     time: str
@@ -99,24 +89,20 @@ class HourlyForecast(BaseModel):
     pressure: int  # Added pressure field
     icon_url: str  # Added icon_url field
 
-    model_config = {
-        "from_attributes": True
-    }
+    model_config = FAST_ORM_CONFIG
 
 class DailyForecast(BaseModel):
     date: str
     temperature: Dict[str, Optional[float]]
-    humidity: float
+    humidity: int
     wind_speed: float
     description: str
     hourly_forecast: List[HourlyForecast]
     forecast_interval: str
-    pressure: float  # Added pressure field
+    pressure: int  # Added pressure field
     icon_url: Optional[str] = None  # Added icon_url field for daily summary
 
-    model_config = {
-        "from_attributes": True
-    }
+    model_config = FAST_ORM_CONFIG
 
 class LocationDetails(BaseModel):
     name: str
@@ -131,6 +117,5 @@ class WeatherForecast(BaseModel):
     forecast_interval_hours: int
     forecast: List[DailyForecast]
 
-    model_config = {
-        "from_attributes": True
-    }
+    # Built server-side from already-typed upstream data via model_construct
+    model_config = FAST_ORM_CONFIG
@@ -10,24 +10,16 @@ def modify_columns():
         # Create engine
         engine = create_engine(settings.DATABASE_URL)
         
-        # SQL commands to modify columns
-        sql_commands = [
-            """
-            ALTER TABLE disease_prediction_history 
-            ALTER COLUMN crop_name DROP NOT NULL;
-            """,
-            """
-            ALTER TABLE disease_prediction_history 
+        # Both sub-commands go in one ALTER TABLE so the table lock is taken once
+        sql = """
+            ALTER TABLE disease_prediction_history
+            ALTER COLUMN crop_name DROP NOT NULL,
             ALTER COLUMN query DROP NOT NULL;
             """
-        ]
-        
-        # Execute each command
-        with engine.connect() as connection:
-            for sql in sql_commands:
-                connection.execute(text(sql))
-                connection.commit()
-                logger.info(f"Successfully executed: {sql}")
+
+        with engine.begin() as connection:
+            connection.execute(text(sql))
+            logger.info(f"Successfully executed: {sql}")
                 
         logger.info("Successfully modified columns")
         
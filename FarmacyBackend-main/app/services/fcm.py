@@ -1,20 +1,361 @@
+import asyncio
+import hashlib
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Dict, List, Optional
+import httpx
+from cachetools import TTLCache
+from sqlalchemy import exists, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 import firebase_admin
-from firebase_admin import messaging
+from firebase_admin import exceptions, messaging, _http_client
+from google.auth.transport import requests as google_requests
+from requests.adapters import HTTPAdapter
 from app.database import get_db_session
-from app.models.fcm import FCMToken, NotificationTopic
+from app.models.fcm import FCMToken, NotificationTopic, user_topic_subscriptions
 from app.models.user import User
 from app.core.config import IST_TIME, settings
 from app.core.logger import logger
+from app.redis_client import delete_key, set_if_absent
 from firebase_admin._messaging_utils import UnregisteredError
 
+# Keys in notification data that are carried in the notification payload instead
+_EXCLUDED_DATA_KEYS = frozenset({"image_url", "sound"})
+
+# FCM accepts at most 500 registration tokens per multicast request
+FCM_MULTICAST_LIMIT = 500
+
+# FCM topic management accepts at most 1000 registration tokens per call
+FCM_TOPIC_MANAGEMENT_LIMIT = 1000
+
+# FCM serves at most 100 concurrent HTTP/2 streams per connection
+FCM_MAX_CONCURRENT_SENDS = 100
+
+# Transient send failures (429/5xx) are retried with jittered exponential backoff
+FCM_SEND_MAX_ATTEMPTS = 4
+FCM_BACKOFF_BASE_SEC = 0.5
+FCM_BACKOFF_MAX_SEC = 32.0
+_RETRYABLE_SEND_ERRORS = (
+    messaging.QuotaExceededError,
+    exceptions.UnavailableError,
+    exceptions.InternalError,
+)
+
+FCM_SEND_URL = "https://fcm.googleapis.com/v1/projects/{project_id}/messages:send"
+
+_fcm_http: Optional[httpx.AsyncClient] = None
+_fcm_credentials = None
+_fcm_token_lock = asyncio.Lock()
+
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    """Backoff before retrying a failed send, honouring FCM's Retry-After header."""
+    response = getattr(error, "http_response", None)
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), FCM_BACKOFF_MAX_SEC)
+    delay = FCM_BACKOFF_BASE_SEC * (2 ** attempt)
+    return min(delay + random.uniform(0, delay), FCM_BACKOFF_MAX_SEC)
+
+
+def _get_fcm_http() -> httpx.AsyncClient:
+    global _fcm_http
+    if _fcm_http is None:
+        _fcm_http = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=60.0)
+        )
+    return _fcm_http
+
+
+async def close_fcm_http():
+    """Close the shared FCM HTTP client (called on application shutdown)."""
+    global _fcm_http
+    if _fcm_http is not None:
+        await _fcm_http.aclose()
+        _fcm_http = None
+
+
+def warm_fcm_messaging_client():
+    """
+    Build the Admin SDK messaging client once at startup.
+
+    send_each fans out on a thread pool, so the session gets a connection pool
+    sized for that fan-out, and the OAuth token is fetched before the first send.
+    """
+    service = messaging._get_messaging_service(firebase_admin.get_app())
+    session = service._client.session
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=FCM_MAX_CONCURRENT_SENDS,
+        max_retries=_http_client.DEFAULT_RETRY_CONFIG
+    ))
+    session.credentials.refresh(google_requests.Request())
+    logger.info("FCM messaging client warmed up")
+
+
+async def _get_access_token(stale_token: Optional[str] = None) -> str:
+    """
+    Return a cached OAuth token for the Firebase app, refreshing it when expired.
+
+    google-auth reports credentials as invalid a few minutes before expiry, so
+    the token is renewed ahead of time. Passing the token FCM just rejected forces
+    a refresh unless another send already replaced it.
+    """
+    global _fcm_credentials
+    if _fcm_credentials is None:
+        _fcm_credentials = firebase_admin.get_app().credential.get_credential()
+
+    def needs_refresh() -> bool:
+        return not _fcm_credentials.valid or (stale_token is not None and _fcm_credentials.token == stale_token)
+
+    if needs_refresh():
+        # Only one coroutine refreshes; the others wait and reuse the new token
+        async with _fcm_token_lock:
+            if needs_refresh():
+                # google-auth refreshes synchronously, so keep it off the event loop
+                await asyncio.to_thread(_fcm_credentials.refresh, google_requests.Request())
+    return _fcm_credentials.token
+
+
+async def _post_fcm_message(message: dict) -> httpx.Response:
+    url = FCM_SEND_URL.format(project_id=firebase_admin.get_app().project_id)
+    access_token = await _get_access_token()
+    response = await _get_fcm_http().post(
+        url,
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"message": message}
+    )
+    if response.status_code == 401:
+        # The token was revoked or expired early; refresh it and retry once
+        access_token = await _get_access_token(stale_token=access_token)
+        response = await _get_fcm_http().post(
+            url,
+            headers={"Authorization": f"Bearer {access_token}"},
+            json={"message": message}
+        )
+    return response
+
+
+def _build_v1_message(
+    token: str,
+    title: str,
+    body: str,
+    data: dict,
+    image: Optional[str] = None,
+    priority: str = "high",
+    sound: Optional[str] = None
+) -> dict:
+    """FCM v1 REST equivalent of FCMService.build_message, android config included."""
+    notification = {"title": title, "body": body}
+    android_notification = {"sound": sound or "sound1", "channel_id": "default"}
+    if image:
+        notification["image"] = image
+        android_notification["image"] = image
+    return {
+        "token": token,
+        "notification": notification,
+        "android": {"priority": priority.upper(), "notification": android_notification},
+        "data": data,
+    }
+
+
+def _stringify_data(data: Optional[dict]) -> dict:
+    """FCM data values must be strings; drop empty values and payload-only keys."""
+    return {
+        str(key): str(value)
+        for key, value in (data or {}).items()
+        if value is not None and key not in _EXCLUDED_DATA_KEYS
+    }
+
+
+def _dedupe_key(token: str, title: str, body: str) -> str:
+    digest = hashlib.blake2b(f"{token}\x00{title}\x00{body}".encode(), digest_size=16).hexdigest()
+    return f"fcm:dedup:{digest}"
+
+
+def _is_duplicate_send(token: str, title: str, body: str) -> bool:
+    """
+    True if the same notification is already being sent, or was sent, to this
+    token within the dedupe window. Otherwise claims the window for this send.
+    """
+    window = settings.FCM_DEDUPE_WINDOW_SEC
+    if window <= 0:
+        return False
+    return not set_if_absent(_dedupe_key(token, title, body), window)
+
+
+def _release_send(token: str, title: str, body: str):
+    """Drop the dedupe claim of a failed send so a retry is not skipped as a duplicate."""
+    if settings.FCM_DEDUPE_WINDOW_SEC > 0:
+        delete_key(_dedupe_key(token, title, body))
+
+
+@lru_cache(maxsize=256)
+def _condition_for(topic_names: tuple) -> str:
+    """Build (and memoize) the FCM condition for a sorted tuple of topic names."""
+    return " || ".join(f"'{topic}' in topics" for topic in topic_names)
+
+
+@lru_cache(maxsize=256)
+def _notification_for(title: str, body: str, image: Optional[str] = None) -> messaging.Notification:
+    return messaging.Notification(title=title, body=body, image=image)
+
+
+def _is_unregistered(response: httpx.Response) -> bool:
+    if response.status_code not in (400, 404):
+        return False
+    try:
+        details = response.json().get("error", {}).get("details", [])
+    except ValueError:
+        return False
+    return any(detail.get("errorCode") == "UNREGISTERED" for detail in details)
+
+
+# user_id -> FCM token (or None) for the notification hot path. Entries are dropped
+# whenever a token is registered, reassigned or removed.
+_token_cache: TTLCache = TTLCache(maxsize=50_000, ttl=300)
+_token_cache_lock = threading.RLock()
+
+
+def _invalidate_cached_tokens(user_id: Optional[int] = None, tokens=()):
+    with _token_cache_lock:
+        if user_id is not None:
+            _token_cache.pop(user_id, None)
+        if tokens:
+            stale = set(tokens)
+            for cached_user_id, cached_token in list(_token_cache.items()):
+                if cached_token in stale:
+                    _token_cache.pop(cached_user_id, None)
+
+
+class TopicSubscribeBatcher:
+    """
+    Coalesce FCM topic subscriptions submitted within a short window.
+
+    Requests queued during the window share one token query and one
+    messaging.subscribe_to_topic call per topic.
+    """
+
+    def __init__(self, window: float = 0.01):
+        self.window = window
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, user_id: int, topic_name: str) -> bool:
+        """Subscribe the user's active tokens to the topic; resolves once the batch is sent."""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._drain())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((user_id, topic_name, future))
+        return await future
+
+    async def _drain(self):
+        while True:
+            pending = [await self._queue.get()]
+            await asyncio.sleep(self.window)
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+
+            try:
+                # Both the token query and the Admin SDK call block, keep them off the event loop
+                results = await asyncio.to_thread(
+                    self._subscribe_batch, [(user_id, topic_name) for user_id, topic_name, _ in pending]
+                )
+            except Exception as e:
+                logger.error("Error subscribing batch of %s users to topics: %s", len(pending), e, exc_info=True)
+                results = {}
+
+            for user_id, topic_name, future in pending:
+                if not future.done():
+                    future.set_result(results.get((user_id, topic_name), False))
+
+    @staticmethod
+    def _subscribe_batch(pairs: List[tuple]) -> dict:
+        users_by_topic = defaultdict(set)
+        for user_id, topic_name in pairs:
+            users_by_topic[topic_name].add(user_id)
+
+        tokens_by_user = defaultdict(list)
+        with get_db_session() as db:
+            rows = db.query(FCMToken.user_id, FCMToken.token).filter(
+                FCMToken.user_id.in_({user_id for user_id, _ in pairs}),
+                FCMToken.is_active == True
+            ).all()
+        for user_id, token in rows:
+            tokens_by_user[user_id].append(token)
+
+        results = {}
+        for topic_name, user_ids in users_by_topic.items():
+            owners = [(token, user_id) for user_id in user_ids for token in tokens_by_user[user_id]]
+            for user_id in user_ids:
+                # Users without active tokens have nothing to subscribe
+                results[(user_id, topic_name)] = not tokens_by_user[user_id]
+
+            for start in range(0, len(owners), FCM_TOPIC_MANAGEMENT_LIMIT):
+                chunk = owners[start:start + FCM_TOPIC_MANAGEMENT_LIMIT]
+                try:
+                    response = messaging.subscribe_to_topic([token for token, _ in chunk], topic_name)
+                except Exception as e:
+                    logger.error("Error subscribing to topic %s: %s", topic_name, e, exc_info=True)
+                    continue
+                failed = {error.index for error in response.errors}
+                for index, (_, user_id) in enumerate(chunk):
+                    if index not in failed:
+                        results[(user_id, topic_name)] = True
+                logger.info(
+                    "Subscribed %s/%s tokens to FCM topic %s",
+                    response.success_count, len(chunk), topic_name
+                )
+        return results
+
+
+topic_subscribe_batcher = TopicSubscribeBatcher()
+
+
 class FCMService:
     @staticmethod
     def get_user_token(db: Session, user_id: int):
+        with _token_cache_lock:
+            if user_id in _token_cache:
+                return _token_cache[user_id]
+
         token = db.query(FCMToken).filter(FCMToken.user_id == user_id).first()
-        return token.token if token else None
+        token = token.token if token else None
+
+        with _token_cache_lock:
+            _token_cache[user_id] = token
+        return token
+
+    @staticmethod
+    def get_user_tokens(db: Session, user_ids) -> Dict[int, Optional[str]]:
+        """Bulk version of get_user_token: one query for every user not already cached."""
+        tokens = {}
+        missing = set()
+        with _token_cache_lock:
+            for user_id in set(user_ids):
+                if user_id in _token_cache:
+                    tokens[user_id] = _token_cache[user_id]
+                else:
+                    missing.add(user_id)
+
+        if missing:
+            loaded = dict.fromkeys(missing)
+            rows = db.query(FCMToken.user_id, FCMToken.token).filter(FCMToken.user_id.in_(missing)).all()
+            for user_id, token in rows:
+                if loaded[user_id] is None:
+                    loaded[user_id] = token
+            with _token_cache_lock:
+                _token_cache.update(loaded)
+            tokens.update(loaded)
+        return tokens
     
     @staticmethod
     def register_token(db: Session, user_id: int, token: str, device_type: str) -> FCMToken:
@@ -22,45 +363,33 @@ class FCMService:
         logger.info(f"Registering Token {token}, userid: {user_id}")
         
         try:
-            # Check if this exact token already exists for this user
-            existing_token = db.query(FCMToken).filter(
-                FCMToken.user_id == user_id,
-                FCMToken.token == token
-            ).first()
-            
-            if existing_token:
-                # Update existing token
-                existing_token.device_type = device_type
-                existing_token.is_active = True
-                existing_token.last_used_at = datetime.now(IST_TIME)
-                db.commit()
-                logger.info(f"Updated existing FCM token for user {user_id}: {token}")
-                return existing_token
-            
-            # Check if this token is used by another user
-            token_used_by_other = db.query(FCMToken).filter(
-                FCMToken.token == token,
-                FCMToken.user_id != user_id
-            ).first()
-            
-            if token_used_by_other:
-                # Remove the token from other user
-                logger.info(f"Removing token {token} from user {token_used_by_other.user_id} as it's being used by user {user_id}")
-                db.delete(token_used_by_other)
-                db.commit()
-            
-            # Create new token for user
-            fcm_token = FCMToken(
+            # One round-trip: insert the token, or take it over (from this or another
+            # user) if it is already registered
+            now = datetime.now(IST_TIME)
+            stmt = insert(FCMToken).values(
                 user_id=user_id,
                 token=token,
                 device_type=device_type,
                 is_active=True,
-                last_used_at=datetime.now(IST_TIME)
+                last_used_at=now
             )
-            logger.info(f"Adding new FCM token for user {user_id}: {token}")
-            db.add(fcm_token)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[FCMToken.token],
+                set_={
+                    "user_id": stmt.excluded.user_id,
+                    "device_type": stmt.excluded.device_type,
+                    "is_active": True,
+                    "last_used_at": stmt.excluded.last_used_at,
+                }
+            ).returning(FCMToken)
+
+            fcm_token = db.scalars(
+                stmt, execution_options={"populate_existing": True}
+            ).one()
             db.commit()
-            db.refresh(fcm_token)
+            # The token may have moved from another user, so drop it wherever it is cached
+            _invalidate_cached_tokens(user_id, [token])
+            logger.info(f"Registered FCM token for user {user_id}: {token}")
             return fcm_token
             
         except Exception as e:
@@ -72,16 +401,15 @@ class FCMService:
     def unregister_token(db: Session, token: str, user_id: int) -> bool:
         """Unregister a specific FCM token for a user."""
         try:
-            # Find and delete the specific token for this user
-            fcm_token = db.query(FCMToken).filter(
+            # Delete the specific token for this user without loading the row
+            deleted = db.query(FCMToken).filter(
                 FCMToken.user_id == user_id,
                 FCMToken.token == token
-            ).first()
+            ).delete(synchronize_session=False)
             
-            if fcm_token:
-                logger.info(f"Unregistering specific token {fcm_token.token} for user {user_id}")
-                db.delete(fcm_token)
+            if deleted:
                 db.commit()
+                _invalidate_cached_tokens(user_id)
                 logger.info(f"Successfully unregistered token {token} for user {user_id}")
                 return True
             else:
@@ -97,18 +425,17 @@ class FCMService:
     def unregister_all_user_tokens(db: Session, user_id: int) -> bool:
         """Unregister all FCM tokens for a user (useful for logout)."""
         try:
-            fcm_tokens = db.query(FCMToken).filter(FCMToken.user_id == user_id).all()
-            
-            if fcm_tokens:
-                for fcm_token in fcm_tokens:
-                    logger.info(f"Unregistering token {fcm_token.token} for user {user_id}")
-                    db.delete(fcm_token)
-                db.commit()
-                logger.info(f"Successfully unregistered {len(fcm_tokens)} tokens for user {user_id}")
-                return True
+            deleted = db.query(FCMToken).filter(
+                FCMToken.user_id == user_id
+            ).delete(synchronize_session=False)
+            db.commit()
+            _invalidate_cached_tokens(user_id)
+
+            if deleted:
+                logger.info(f"Successfully unregistered {deleted} tokens for user {user_id}")
             else:
                 logger.info(f"No FCM tokens found for user {user_id}")
-                return True  # Consider this a success since the goal is achieved
+            return True  # No tokens left is a success either way
                 
         except Exception as e:
             logger.error(f"Error unregistering all FCM tokens for user {user_id}: {str(e)}")
@@ -128,63 +455,57 @@ class FCMService:
         db.refresh(topic)
         return topic
 
+    @staticmethod
+    def _get_topic_id_for_user(db: Session, user_id: int, topic_name: str) -> Optional[int]:
+        """Return the topic id if both the user and the topic exist, in one round-trip."""
+        return db.execute(
+            select(NotificationTopic.id)
+            .where(NotificationTopic.name == topic_name)
+            .where(exists().where(User.id == user_id))
+        ).scalar_one_or_none()
+
     @staticmethod
     async def subscribe_to_topic(db: Session, user_id: int, topic_name: str) -> bool:
         """Subscribe a user to a topic."""
         logger.info(f"Attempting to subscribe user {user_id} to topic {topic_name}")
         
-        user = db.query(User).filter(User.id == user_id).first()
-        topic = db.query(NotificationTopic).filter(NotificationTopic.name == topic_name).first()
-        
-        if not user or not topic:
+        topic_id = FCMService._get_topic_id_for_user(db, user_id, topic_name)
+        if topic_id is None:
             logger.error(f"User {user_id} or topic {topic_name} not found")
             return False
         
         logger.info(f"Found user and topic, checking existing subscription")
 
-        # Add user to topic subscribers
-        if topic not in user.subscribed_topics:
+        # Add user to topic subscribers, checking the association row instead of
+        # loading the user's whole subscribed_topics collection
+        is_subscribed = db.query(exists().where(
+            user_topic_subscriptions.c.user_id == user_id,
+            user_topic_subscriptions.c.topic_id == topic_id
+        )).scalar()
+        if not is_subscribed:
             logger.info(f"Adding user {user_id} to topic {topic_name} subscribers")
-            user.subscribed_topics.append(topic)
+            db.execute(user_topic_subscriptions.insert().values(user_id=user_id, topic_id=topic_id))
             db.commit()
         else:
             logger.info(f"User {user_id} already subscribed to topic {topic_name}")
             return True
 
-        # Subscribe all user's active tokens to the FCM topic
-        tokens = db.query(FCMToken).filter(
-            FCMToken.user_id == user_id,
-            FCMToken.is_active == True
-        ).all()
-
-        if tokens:
-            token_list = [token.token for token in tokens]
-            logger.info(f"Found {len(token_list)} active tokens for user {user_id}")
-            try:
-                logger.info(f"Subscribing tokens to FCM topic {topic_name}")
-                response = messaging.subscribe_to_topic(token_list, topic_name)
-                logger.info(f"FCM subscription response: {response}")
-                return response.success_count > 0
-            except Exception as e:
-                logger.error(f"Error subscribing to topic: {str(e)}")
-                logger.exception("Full traceback:")
-                return False
-        else:
-            logger.warning(f"No active FCM tokens found for user {user_id}")
-        return True
+        # Subscribe all user's active tokens to the FCM topic, batched with concurrent requests
+        return await topic_subscribe_batcher.submit(user_id, topic_name)
 
     @staticmethod
     async def unsubscribe_from_topic(db: Session, user_id: int, topic_name: str) -> bool:
         """Unsubscribe a user from a topic."""
-        user = db.query(User).filter(User.id == user_id).first()
-        topic = db.query(NotificationTopic).filter(NotificationTopic.name == topic_name).first()
-        
-        if not user or not topic:
+        topic_id = FCMService._get_topic_id_for_user(db, user_id, topic_name)
+        if topic_id is None:
             return False
 
         # Remove user from topic subscribers
-        if topic in user.subscribed_topics:
-            user.subscribed_topics.remove(topic)
+        removed = db.execute(user_topic_subscriptions.delete().where(
+            user_topic_subscriptions.c.user_id == user_id,
+            user_topic_subscriptions.c.topic_id == topic_id
+        )).rowcount
+        if removed:
             db.commit()
 
         # Unsubscribe all user's active tokens from the FCM topic
@@ -213,8 +534,9 @@ class FCMService:
     ) -> bool:
         """Send a message to all subscribers of a topic."""
         try:
-            logger.info(f"Attempting to send topic message to {topic_name}")
-            logger.info(f"Message details - Title: {title}, Body: {body}, Data: {data}")
+            logger.info("Sending topic message to %s: %s", topic_name, title)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Topic message body=%s data=%s", body, data)
             
             message = messaging.Message(
                 notification=messaging.Notification(
@@ -226,13 +548,10 @@ class FCMService:
                 topic=topic_name
             )
             
-            logger.info("Message constructed, sending to FCM...")
             response = messaging.send(message)
-            logger.info(f"FCM Response: {response}")
             return bool(response)
         except Exception as e:
-            logger.error(f"Error sending topic message: {str(e)}")
-            logger.exception("Full traceback:")
+            logger.error("Error sending topic message: %s", e, exc_info=True)
             return False
 
     @staticmethod
@@ -245,15 +564,10 @@ class FCMService:
     ) -> bool:
         """Send a message to subscribers of multiple topics."""
         try:
-            condition = " || ".join([f"'%s' in topics" % topic for topic in topic_names])
             message = messaging.Message(
-                notification=messaging.Notification(
-                    title=title,
-                    body=body,
-                    image=image
-                ),
+                notification=_notification_for(title, body, image),
                 data=data or {},
-                condition=condition
+                condition=_condition_for(tuple(sorted(topic_names)))
             )
             response = messaging.send(message)
             return bool(response)
@@ -273,7 +587,7 @@ class FCMService:
         sound: Optional[str] = None,
         badge: Optional[int] = None,
         click_action: Optional[str] = None
-    ) -> bool:
+    ) -> Optional[bool]:
         """
         Send a direct push notification using Firebase Cloud Messaging.
         
@@ -290,73 +604,132 @@ class FCMService:
             click_action: Action to perform when notification is clicked
             
         Returns:
-            bool: True if notification was sent successfully, False otherwise
+            Optional[bool]: True if notification was sent successfully, None if it was
+            skipped as a duplicate, False otherwise
         """
         try:
-            # Convert all data values to strings
-            stringified_data = {}
-            if data:
-                for key, value in data.items():
-                    stringified_data[str(key)] = str(value)
-
-            # Log the notification details
-            logger.info(f"Preparing notification with details:")
-            logger.info(f"Token: {token}")
-            logger.info(f"Title: {title}")
-            logger.info(f"Body: {body}")
-            logger.info(f"Data: {stringified_data}")
-            logger.info(f"Priority: {priority}")
-
-            # Prepare the message with both notification and data payload
-            message = messaging.Message(
-                notification=messaging.Notification(
-                    title=title,
-                    body=body,
-                    image=image
-                ),
-                data=stringified_data,
-                token=token,
-                # android=messaging.AndroidConfig(
-                #     priority=priority,
-                #     ttl=ttl,
-                    # notification=messaging.AndroidNotification(
-                    #     sound=sound or "default",
-                    #     click_action=click_action,
-                    #     channel_id="default",  # Add default channel ID for Android
-                    #     priority="high",
-                    #     visibility="public"
-                    # )
-                # ),
-                # apns=messaging.APNSConfig(
-                #     payload=messaging.APNSPayload(
-                #         aps=messaging.Aps(
-                #             sound=sound or "default",
-                #             badge=badge,
-                #             content_available=True,
-                #             mutable_content=True,
-                #             alert=messaging.ApsAlert(
-                #                 title=title,
-                #                 body=body
-                #             )
-                #         )
-                #     ),
-                #     headers={
-                #         "apns-priority": "10"  # High priority for APNS
-                #     }
-                # )
-            )
+            stringified_data = _stringify_data(data)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Preparing notification token=%s title=%s body=%s data=%s priority=%s",
+                    token, title, body, stringified_data, priority
+                )
 
-            # Send the notification using FCM
-            response = messaging.send(message)
-            logger.info(f"FCM Response: {response}")
-            logger.info(f"Successfully sent notification to token: {token}")
-            return bool(response)
+            # image_url is dropped from the data payload, so carry it as the notification image
+            image = image or (data or {}).get("image_url")
+
+            # Build the FCM v1 message with both notification and data payload
+            message = _build_v1_message(token, title, body, stringified_data, image, priority, sound)
+
+            if _is_duplicate_send(token, title, body):
+                logger.info("Skipping duplicate notification to token %s", token)
+                return None
+
+            # Send over the shared async client so the event loop is not blocked
+            try:
+                response = await _post_fcm_message(message)
+            except Exception:
+                _release_send(token, title, body)
+                raise
+            if response.status_code == 200:
+                logger.info("Sent notification to token %s", token)
+                return True
+
+            _release_send(token, title, body)
+            if _is_unregistered(response):
+                logger.warning("Unregistered FCM token: %s", token)
+            else:
+                logger.error("FCM send failed with status %s: %s", response.status_code, response.text)
+            return False
 
         except Exception as e:
-            logger.error(f"Error sending notification: {str(e)}")
-            logger.exception("Full traceback:")
+            logger.error("Error sending notification: %s", e, exc_info=True)
             return False
 
+    @staticmethod
+    async def send_many_async(db: Session, targets: List[tuple]) -> List[bool]:
+        """
+        Send many direct notifications concurrently.
+
+        Args:
+            db: Session used to prune tokens FCM reports as unregistered
+            targets: (token, title, body, data[, image]) tuples, one per message
+
+        Returns:
+            List[bool]: Per-target success flags, in the order of targets
+        """
+        semaphore = asyncio.Semaphore(FCM_MAX_CONCURRENT_SENDS)
+
+        async def _one(token, title, body, data, image=None):
+            stringified_data = _stringify_data(data)
+            # image_url is dropped from the data payload, so carry it as the notification image
+            image = image or (data or {}).get("image_url")
+            async with semaphore:
+                return await _post_fcm_message(_build_v1_message(token, title, body, stringified_data, image))
+
+        responses = await asyncio.gather(
+            *[_one(*target) for target in targets], return_exceptions=True
+        )
+
+        results = []
+        dead_tokens = []
+        for target, response in zip(targets, responses):
+            if isinstance(response, Exception):
+                logger.error(f"Error sending notification to token {target[0]}: {str(response)}")
+                results.append(False)
+            elif response.status_code == 200:
+                results.append(True)
+            else:
+                if _is_unregistered(response):
+                    dead_tokens.append(target[0])
+                else:
+                    logger.error(f"FCM send failed with status {response.status_code}: {response.text}")
+                results.append(False)
+
+        if dead_tokens:
+            try:
+                db.query(FCMToken).filter(
+                    FCMToken.token.in_(dead_tokens)
+                ).delete(synchronize_session=False)
+                db.commit()
+                _invalidate_cached_tokens(tokens=dead_tokens)
+                logger.info(f"Removed {len(dead_tokens)} unregistered FCM tokens")
+            except Exception as e:
+                logger.error(f"Error removing unregistered FCM tokens: {str(e)}")
+                db.rollback()
+
+        logger.info(f"Sent {sum(results)}/{len(targets)} notifications")
+        return results
+
+    @staticmethod
+    def build_message(
+        token: str,
+        title: str,
+        body: str,
+        data: Optional[dict] = None,
+        image: Optional[str] = None,
+        priority: str = "high",
+        sound: Optional[str] = None
+    ) -> messaging.Message:
+        """Build a direct Admin SDK message with notification, data, and android config."""
+        return messaging.Message(
+            notification=messaging.Notification(
+                title=title,
+                body=body,
+                image=image
+            ),
+            android=messaging.AndroidConfig(
+                priority=priority,
+                notification=messaging.AndroidNotification(
+                    sound=sound or "sound1",  # Default to custom sound instead of "default"
+                    image=image,
+                    channel_id="default"
+                )
+            ),
+            data=_stringify_data(data),  # Only routing info, no title/body/image
+            token=token,
+        )
+
     @staticmethod
     def _send_notification_sync(
         user_id: int,
@@ -370,7 +743,7 @@ class FCMService:
         sound: Optional[str] = None,
         badge: Optional[int] = None,
         click_action: Optional[str] = None
-    ) -> bool:
+    ) -> Optional[bool]:
         """
         Synchronous version of send_notification for background tasks.
         
@@ -387,45 +760,29 @@ class FCMService:
             click_action: Action to perform when notification is clicked
             
         Returns:
-            bool: True if notification was sent successfully, False otherwise
+            Optional[bool]: True if notification was sent successfully, None if it was
+            skipped as a duplicate, False otherwise
         """
         try:
-            # Convert all data values to strings and remove image/sound from data
-            stringified_data = {}
-            if data:
-                for key, value in data.items():
-                    if value is not None and key not in ['image_url', 'sound']:
-                        stringified_data[str(key)] = str(value)
-
-            logger.info(f"[SYNC] Preparing notification with details:")
-            logger.info(f"[SYNC] Token: {token}")
-            logger.info(f"[SYNC] Title: {title}")
-            logger.info(f"[SYNC] Body: {body}")
-            logger.info(f"[SYNC] Data: {stringified_data}")
-            logger.info(f"[SYNC] Priority: {priority}")
-
-            # Prepare the message with notification, data, and android config
-            message = messaging.Message(
-                notification=messaging.Notification(
-                    title=title,
-                    body=body,
-                    image=image
-                ),
-                android=messaging.AndroidConfig(
-                    priority=priority,
-                    notification=messaging.AndroidNotification(
-                        sound=sound or "sound1",  # Default to custom sound instead of "default"
-                        image=image,
-                        channel_id="default"
-                    )
-                ),
-                data=stringified_data,  # Only routing info, no title/body/image
-                token=token,
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "[SYNC] Preparing notification token=%s title=%s body=%s data=%s priority=%s",
+                    token, title, body, data, priority
+                )
 
-            response = messaging.send(message)
-            logger.info(f"[SYNC] FCM Response: {response}")
-            logger.info(f"[SYNC] Successfully sent notification to token: {token}")
+            # Data values are stringified and image/sound keys dropped while building
+            message = FCMService.build_message(token, title, body, data, image, priority, sound)
+
+            if _is_duplicate_send(token, title, body):
+                logger.info("[SYNC] Skipping duplicate notification to token %s", token)
+                return None
+
+            try:
+                response = messaging.send(message)
+            except Exception:
+                _release_send(token, title, body)
+                raise
+            logger.info("[SYNC] Sent notification to token %s: %s", token, response)
             return bool(response)
 
         except UnregisteredError:
@@ -436,10 +793,138 @@ class FCMService:
             return False
 
         except Exception as e:
-            logger.error(f"[SYNC] Error sending notification: {str(e)}")
-            logger.exception("[SYNC] Full traceback:")
+            logger.error("[SYNC] Error sending notification: %s", e, exc_info=True)
             return False
 
+    @staticmethod
+    def send_multicast(
+        db: Session,
+        tokens: List[str],
+        title: str,
+        body: str,
+        data: Optional[dict] = None,
+        image: Optional[str] = None,
+        priority: str = "high",
+        sound: Optional[str] = None
+    ) -> int:
+        """
+        Send the same notification to many tokens using FCM batch sends.
+
+        Tokens are sent in chunks of FCM_MULTICAST_LIMIT. Tokens that FCM reports as
+        unregistered are deleted in a single query once all chunks have been sent.
+        Messages rejected with 429/5xx are resent with jittered exponential backoff.
+
+        Returns:
+            int: Number of tokens the notification was delivered to
+        """
+        stringified_data = _stringify_data(data)
+
+        android = messaging.AndroidConfig(
+            priority=priority,
+            notification=messaging.AndroidNotification(
+                sound=sound or "sound1",
+                image=image,
+                channel_id="default"
+            )
+        )
+
+        success_count = 0
+        dead_tokens = []
+        for start in range(0, len(tokens), FCM_MULTICAST_LIMIT):
+            chunk = tokens[start:start + FCM_MULTICAST_LIMIT]
+            message = messaging.MulticastMessage(
+                notification=messaging.Notification(
+                    title=title,
+                    body=body,
+                    image=image
+                ),
+                android=android,
+                data=stringified_data,
+                tokens=chunk,
+            )
+            try:
+                response = messaging.send_each_for_multicast(message)
+            except Exception as e:
+                logger.error(f"[SYNC] Error sending multicast batch of {len(chunk)} tokens: {str(e)}")
+                continue
+
+            success_count += response.success_count
+            for token, send_response in zip(chunk, response.responses):
+                if isinstance(send_response.exception, UnregisteredError):
+                    dead_tokens.append(token)
+
+        if dead_tokens:
+            try:
+                db.query(FCMToken).filter(
+                    FCMToken.token.in_(dead_tokens)
+                ).delete(synchronize_session=False)
+                db.commit()
+                _invalidate_cached_tokens(tokens=dead_tokens)
+                logger.info(f"[SYNC] Removed {len(dead_tokens)} unregistered FCM tokens")
+            except Exception as e:
+                logger.error(f"[SYNC] Error removing unregistered FCM tokens: {str(e)}")
+                db.rollback()
+
+        logger.info(f"[SYNC] Multicast delivered to {success_count}/{len(tokens)} tokens")
+        return success_count
+
+    @staticmethod
+    def send_each_sync(db: Session, messages: List[messaging.Message]) -> List[bool]:
+        """
+        Send many different direct messages using FCM batch sends.
+
+        Messages are sent in chunks of FCM_MULTICAST_LIMIT. Tokens that FCM reports as
+        unregistered are deleted in a single query once all chunks have been sent.
+
+        Returns:
+            List[bool]: Per-message success flags, in the order of messages
+        """
+        results = []
+        dead_tokens = []
+        for start in range(0, len(messages), FCM_MULTICAST_LIMIT):
+            chunk = messages[start:start + FCM_MULTICAST_LIMIT]
+            chunk_results = [False] * len(chunk)
+            pending = list(range(len(chunk)))
+            for attempt in range(FCM_SEND_MAX_ATTEMPTS):
+                try:
+                    response = messaging.send_each([chunk[i] for i in pending])
+                except Exception as e:
+                    logger.error(f"[SYNC] Error sending batch of {len(pending)} messages: {str(e)}")
+                    break
+
+                retry = []
+                delay = 0.0
+                for index, send_response in zip(pending, response.responses):
+                    if send_response.success:
+                        chunk_results[index] = True
+                    elif isinstance(send_response.exception, UnregisteredError):
+                        dead_tokens.append(chunk[index].token)
+                    elif isinstance(send_response.exception, _RETRYABLE_SEND_ERRORS):
+                        retry.append(index)
+                        delay = max(delay, _retry_delay(attempt, send_response.exception))
+
+                if not retry or attempt == FCM_SEND_MAX_ATTEMPTS - 1:
+                    break
+                logger.warning(f"[SYNC] Retrying {len(retry)} throttled messages in {delay:.1f}s")
+                time.sleep(delay)
+                pending = retry
+            results.extend(chunk_results)
+
+        if dead_tokens:
+            try:
+                db.query(FCMToken).filter(
+                    FCMToken.token.in_(dead_tokens)
+                ).delete(synchronize_session=False)
+                db.commit()
+                _invalidate_cached_tokens(tokens=dead_tokens)
+                logger.info(f"[SYNC] Removed {len(dead_tokens)} unregistered FCM tokens")
+            except Exception as e:
+                logger.error(f"[SYNC] Error removing unregistered FCM tokens: {str(e)}")
+                db.rollback()
+
+        logger.info(f"[SYNC] Batch delivered {sum(results)}/{len(messages)} messages")
+        return results
+
     @staticmethod
     def send_topic_message_sync(
         topic_name: str,
@@ -450,8 +935,9 @@ class FCMService:
     ) -> bool:
         """Synchronous version of send_topic_message for background tasks."""
         try:
-            logger.info(f"[SYNC] Attempting to send topic message to {topic_name}")
-            logger.info(f"[SYNC] Message details - Title: {title}, Body: {body}, Data: {data}")
+            logger.info("[SYNC] Sending topic message to %s: %s", topic_name, title)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[SYNC] Topic message body=%s data=%s", body, data)
             
             message = messaging.Message(
                 notification=messaging.Notification(
@@ -463,13 +949,10 @@ class FCMService:
                 topic=topic_name
             )
             
-            logger.info("[SYNC] Message constructed, sending to FCM...")
             response = messaging.send(message)
-            logger.info(f"[SYNC] FCM Response: {response}")
             return bool(response)
         except Exception as e:
-            logger.error(f"[SYNC] Error sending topic message: {str(e)}")
-            logger.exception("[SYNC] Full traceback:")
+            logger.error("[SYNC] Error sending topic message: %s", e, exc_info=True)
             return False
 
     @staticmethod
@@ -482,15 +965,10 @@ class FCMService:
     ) -> bool:
         """Synchronous version of send_multicast_topic_message for background tasks."""
         try:
-            condition = " || ".join([f"'%s' in topics" % topic for topic in topic_names])
             message = messaging.Message(
-                notification=messaging.Notification(
-                    title=title,
-                    body=body,
-                    image=image
-                ),
+                notification=_notification_for(title, body, image),
                 data=data or {},
-                condition=condition
+                condition=_condition_for(tuple(sorted(topic_names)))
             )
             response = messaging.send(message)
             return bool(response)
@@ -505,4 +983,5 @@ class FCMService:
             FCMToken.token == token
         ).delete()
         db.commit()
+        _invalidate_cached_tokens(user_id)
         logger.info(f"Removed FCM token for user {user_id}")
\ No newline at end of file
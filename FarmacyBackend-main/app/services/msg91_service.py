@@ -1,6 +1,11 @@
-import requests
+import hashlib
+import httpx
 import json
+import logging
+import threading
+from cachetools import TTLCache
 from typing import Optional, Dict, Any
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone, timedelta
 
@@ -10,9 +15,54 @@ from app.core.security import create_access_token, create_refresh_token
 from app.models.user import User
 from app.schemas.otp import MSG91AccessTokenRequest, MSG91AccessTokenResponse, CreateUserRequest
 
+_msg91_http: Optional[httpx.AsyncClient] = None
+
+# Phone numbers verified by MSG91, keyed by an access token digest, so client
+# retries with the same access token skip the MSG91 round-trip. Only the number
+# is cached: user lookup, activation and token issuing still run on every call.
+_verify_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_verify_cache_lock = threading.Lock()
+
+
+def _verify_cache_key(access_token: str) -> str:
+    return hashlib.blake2b(access_token.encode(), digest_size=16).hexdigest()
+
+
+def invalidate_verification_cache(phone_number: str):
+    """Forget cached verifications for a phone number (called on logout)."""
+    with _verify_cache_lock:
+        for key, cached_phone_number in list(_verify_cache.items()):
+            if cached_phone_number == phone_number:
+                _verify_cache.pop(key, None)
+
+
+def _get_msg91_http() -> httpx.AsyncClient:
+    global _msg91_http
+    if _msg91_http is None:
+        _msg91_http = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            transport=httpx.AsyncHTTPTransport(retries=3)
+        )
+    return _msg91_http
+
+
+async def close_msg91_http():
+    """Close the shared MSG91 HTTP client (called on application shutdown)."""
+    global _msg91_http
+    if _msg91_http is not None:
+        await _msg91_http.aclose()
+        _msg91_http = None
+
+
 class MSG91Service:
     """MSG91 OTP Widget service for access token verification"""
     
+    HEADERS = {
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+    }
+    
     def __init__(self):
         self.auth_key = getattr(settings, 'MSG91_AUTH_KEY', None)
         self.verify_url = "https://control.msg91.com/api/v5/widget/verifyAccessToken"
@@ -20,77 +70,46 @@ class MSG91Service:
         if not self.auth_key:
             logger.warning("MSG91 AUTH_KEY not configured")
     
-    def verify_access_token(self, db: Session, request: MSG91AccessTokenRequest) -> MSG91AccessTokenResponse:
+    async def verify_access_token(self, db: Session, request: MSG91AccessTokenRequest) -> MSG91AccessTokenResponse:
         """Verify MSG91 access token and return user status"""
         try:
             if not self.auth_key:
                 raise ValueError("MSG91 AUTH_KEY not configured")
             
-            # Prepare request to MSG91 API
-            headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-            }
-            
-            payload = {
-                "authkey": self.auth_key,
-                "access-token": request.access_token
-            }
-            
-            logger.info(f"Verifying MSG91 access token: {request.access_token[:10]}...")
-            
-            # Make request to MSG91 API
-            response = requests.post(
-                self.verify_url,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            
-            logger.info(f"MSG91 API response status: {response.status_code}")
-            
-            if response.status_code != 200:
-                logger.error(f"MSG91 API error: {response.status_code} - {response.text}")
-                raise ValueError("Failed to verify access token with MSG91")
-            
-            msg91_data = response.json()
-            logger.info(f"MSG91 API response: {msg91_data}")
-            
-            # Check if MSG91 verification was successful
-            if msg91_data.get('type') != 'success':
-                error_msg = msg91_data.get('message', 'Access token verification failed')
-                logger.error(f"MSG91 verification failed: {error_msg}")
-                raise ValueError(error_msg)
-            
-            # Extract phone number from MSG91 response
-            # MSG91 returns phone number in the 'message' field when successful
-            phone_number = msg91_data.get('message')
-            if not phone_number:
-                logger.error("Phone number not found in MSG91 response")
-                raise ValueError("Phone number not found in verification response")
-            
-            # Ensure phone number has country code
-            if not phone_number.startswith('+'):
-                phone_number = f"+{phone_number}"
-            
-            logger.info(f"Successfully verified phone number: {phone_number}")
+            cache_key = _verify_cache_key(request.access_token)
+            with _verify_cache_lock:
+                phone_number = _verify_cache.get(cache_key)
+            if phone_number is not None:
+                logger.info("Using cached MSG91 verification for %s", phone_number)
+            else:
+                phone_number = await self._verify_with_msg91(request.access_token)
+                with _verify_cache_lock:
+                    _verify_cache[cache_key] = phone_number
             
-            # Check if user exists in our database
-            user = db.query(User).filter(User.phone_number == phone_number).first()
+            # Check if user exists in our database (only the id is needed to sign tokens)
+            user_id = db.execute(
+                select(User.id).where(User.phone_number == phone_number)
+            ).scalar_one_or_none()
             
-            if user:
+            if user_id is not None:
                 # Existing user - generate tokens
                 now = datetime.now(timezone.utc)
-                access_token = create_access_token(str(user.id))
-                refresh_token = create_refresh_token(str(user.id))
-                user.is_active = True
+                access_token = create_access_token(str(user_id))
+                refresh_token = create_refresh_token(str(user_id))
                 
-                # Update user's refresh token
-                user.refresh_token = refresh_token
-                user.refresh_token_expires_at = now + timedelta(days=60)
+                # Activate the user and store the refresh token in one statement
+                db.execute(
+                    update(User)
+                    .where(User.id == user_id)
+                    .values(
+                        is_active=True,
+                        refresh_token=refresh_token,
+                        refresh_token_expires_at=now + timedelta(days=60)
+                    )
+                )
                 db.commit()
                 
-                logger.info(f"Existing user authenticated: {user.id}")
+                logger.info("Existing user authenticated: %s", user_id)
                 
                 return MSG91AccessTokenResponse(
                     success=True,
@@ -102,7 +121,7 @@ class MSG91Service:
                 )
             else:
                 # New user - no tokens yet
-                logger.info(f"New user detected: {phone_number}")
+                logger.info("New user detected: %s", phone_number)
                 
                 return MSG91AccessTokenResponse(
                     success=True,
@@ -111,16 +130,61 @@ class MSG91Service:
                     user_exists=False
                 )
                 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network error during MSG91 verification: {e}")
+        except httpx.HTTPError as e:
+            logger.error("Network error during MSG91 verification: %s", e)
             raise ValueError("Network error during verification")
         except ValueError as e:
             # Re-raise ValueError as is
             raise e
         except Exception as e:
-            logger.error(f"Unexpected error during MSG91 verification: {e}")
+            logger.error("Unexpected error during MSG91 verification: %s", e)
             raise ValueError("Failed to verify access token")
     
+    async def _verify_with_msg91(self, access_token: str) -> str:
+        """Verify the access token with MSG91 and return the phone number it was issued for"""
+        # Prepare request to MSG91 API
+        payload = {
+            "authkey": self.auth_key,
+            "access-token": access_token
+        }
+        
+        logger.info("Verifying MSG91 access token: %s...", access_token[:10])
+        
+        # Make request to MSG91 API
+        response = await _get_msg91_http().post(
+            self.verify_url,
+            headers=self.HEADERS,
+            json=payload
+        )
+        
+        if response.status_code != 200:
+            logger.error("MSG91 API error: %s - %s", response.status_code, response.text)
+            raise ValueError("Failed to verify access token with MSG91")
+        
+        msg91_data = response.json()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("MSG91 API response: %s", msg91_data)
+        
+        # Check if MSG91 verification was successful
+        if msg91_data.get('type') != 'success':
+            error_msg = msg91_data.get('message', 'Access token verification failed')
+            logger.error("MSG91 verification failed: %s", error_msg)
+            raise ValueError(error_msg)
+        
+        # Extract phone number from MSG91 response
+        # MSG91 returns phone number in the 'message' field when successful
+        phone_number = msg91_data.get('message')
+        if not phone_number:
+            logger.error("Phone number not found in MSG91 response")
+            raise ValueError("Phone number not found in verification response")
+        
+        # Ensure phone number has country code
+        if not phone_number.startswith('+'):
+            phone_number = f"+{phone_number}"
+        
+        logger.info("Successfully verified phone number: %s", phone_number)
+        return phone_number
+    
     def create_user(self, db: Session, request: CreateUserRequest) -> MSG91AccessTokenResponse:
         """Create a new user after MSG91 verification"""
         try:
@@ -140,20 +204,21 @@ class MSG91Service:
             )
             
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            # Flush to get the new id for the token payloads without ending the transaction
+            db.flush()
+            user_id = user.id
             
             # Generate tokens
             now = datetime.now(timezone.utc)
-            access_token = create_access_token(str(user.id))
-            refresh_token = create_refresh_token(str(user.id))
+            access_token = create_access_token(str(user_id))
+            refresh_token = create_refresh_token(str(user_id))
             
-            # Update user's refresh token
+            # Store the refresh token and commit the new user in one transaction
             user.refresh_token = refresh_token
             user.refresh_token_expires_at = now + timedelta(days=60)
             db.commit()
             
-            logger.info(f"New user created successfully: {user.id}")
+            logger.info(f"New user created successfully: {user_id}")
             
             return MSG91AccessTokenResponse(
                 success=True,
@@ -1,13 +1,14 @@
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import Boolean, String, and_, cast
+from sqlalchemy import String, and_, func, insert, select, text, tuple_, update
 
 from app.models.notification import UserNotification, NotificationType, NotificationPriority
-from app.models.user import User
+from app.models.user import User, DAILY_UPDATES_SUBSCRIBED_SQL
 from app.models.user_personalization import UserCropTracking
 from app.models.crop import CropTranslation, Week, WeekTranslation
-from app.services.fcm import FCMService
+from app.services.fcm import FCMService, FCM_MULTICAST_LIMIT
 from app.core.logger import logger
 from app.core.config import IST_TIME
 
@@ -26,10 +27,14 @@ class NotificationService:
         message: str,
         priority: NotificationPriority = NotificationPriority.MEDIUM,
         data: Optional[Dict[str, Any]] = None,
-        scheduled_for: Optional[datetime] = None
+        scheduled_for: Optional[datetime] = None,
+        now: Optional[datetime] = None
     ) -> UserNotification:
         """Create and optionally send a notification immediately."""
         try:
+            # One clock read covers created_at, the due check and sent_at
+            now = now or NotificationService.get_current_time()
+
             # Convert scheduled_for to Indian timezone if provided
             if scheduled_for:
                 if scheduled_for.tzinfo is None:
@@ -46,19 +51,20 @@ class NotificationService:
                 priority=priority,
                 data=data or {},
                 scheduled_for=scheduled_for,
-                created_at=NotificationService.get_current_time()
+                created_at=now
             )
             
+            # Commit before sending: the id in the push payload must refer to a stored
+            # row, and no transaction should stay open across the FCM round-trip
             db.add(notification)
             db.commit()
-            db.refresh(notification)
             
             logger.info(f"Created notification {notification.id} for user {user_id}")
             
             # Send immediately if not scheduled or scheduled for now/past
-            if not scheduled_for or scheduled_for <= NotificationService.get_current_time():
+            if not scheduled_for or scheduled_for <= now:
                 logger.info("Sending Notification...")
-                await NotificationService._send_notification(notification, db)
+                await NotificationService._send_notification(notification, db, now)
             
             return notification
             
@@ -77,9 +83,13 @@ class NotificationService:
         priority: NotificationPriority = NotificationPriority.MEDIUM,
         data: Optional[Dict[str, Any]] = None,
         scheduled_for: Optional[datetime] = None,
-        sound: Optional[str] = None
+        sound: Optional[str] = None,
+        now: Optional[datetime] = None
     ) -> UserNotification:
         try:
+            # One clock read covers created_at, the due check and sent_at
+            now = now or NotificationService.get_current_time()
+
             if scheduled_for:
                 if scheduled_for.tzinfo is None:
                     scheduled_for = scheduled_for.replace(tzinfo=IST_TIME)
@@ -94,18 +104,20 @@ class NotificationService:
                 priority=priority,
                 data=data or {},
                 scheduled_for=scheduled_for,
-                created_at=NotificationService.get_current_time()
+                created_at=now
             )
 
+            # Commit before sending: the id in the push payload must refer to a stored
+            # row, and no transaction should stay open across the FCM round-trip
             db.add(notification)
             db.commit()
-            db.refresh(notification)
 
             logger.info(f"[SYNC] Created notification {notification.id} for user {user_id}")
 
-            if not scheduled_for or scheduled_for <= NotificationService.get_current_time():
+            if not scheduled_for or scheduled_for <= now:
                 logger.info("[SYNC] Sending Notification...")
-                NotificationService._send_notification_sync(notification, db, sound)
+                NotificationService._send_notification_sync(notification, db, sound, now)
+
             return notification
 
         except Exception as e:
@@ -114,7 +126,45 @@ class NotificationService:
             raise
 
     @staticmethod
-    async def _send_notification(notification: UserNotification, db: Session) -> bool:
+    def create_notifications_bulk(db: Session, rows: List[Dict[str, Any]]) -> List[UserNotification]:
+        """
+        Insert many notifications with one multi-row INSERT ... RETURNING and a single commit.
+
+        Returns detached notifications built from the rows and their new ids, so
+        reading them does not reload each row after the commit.
+        """
+        if not rows:
+            return []
+        try:
+            ids = db.scalars(
+                insert(UserNotification).returning(UserNotification.id, sort_by_parameter_order=True),
+                rows
+            ).all()
+            db.commit()
+            logger.info(f"[SYNC] Created {len(ids)} notifications in bulk")
+            return [UserNotification(id=notification_id, **row) for notification_id, row in zip(ids, rows)]
+        except Exception as e:
+            db.rollback()
+            logger.error(f"[SYNC] Error creating notifications in bulk: {str(e)}")
+            raise
+
+    @staticmethod
+    async def create_and_send_notifications_bulk(
+        db: Session,
+        rows: List[Dict[str, Any]],
+        now: Optional[datetime] = None
+    ) -> int:
+        """Insert many immediate notifications with one INSERT and send them as one FCM batch."""
+        now = now or NotificationService.get_current_time()
+        notifications = NotificationService.create_notifications_bulk(
+            db, [{**row, "created_at": now} for row in rows]
+        )
+        if not notifications:
+            return 0
+        return await NotificationService._send_batch(db, notifications, sent_at=now)
+
+    @staticmethod
+    async def _send_notification(notification: UserNotification, db: Session, sent_at: Optional[datetime] = None) -> bool:
         """Send a notification via FCM."""
         try:
             # Get user's FCM token
@@ -137,10 +187,13 @@ class NotificationService:
                 }
             )
 
+            if success is None:
+                # An identical push went out moments ago; this one was not sent
+                logger.info(f"Skipped duplicate notification {notification.id}")
+                return False
             if success:
                 # Mark as sent with Indian timezone
-                notification.sent_at = NotificationService.get_current_time()
-                db.commit()
+                NotificationService._mark_sent(db, [notification.id], sent_at)
                 logger.info(f"Successfully sent notification {notification.id}")
                 return True
             else:
@@ -150,42 +203,52 @@ class NotificationService:
         except Exception as e:
             logger.error(f"Error sending notification {notification.id}: {str(e)}")
             return False
+
+    @staticmethod
+    def _fcm_payload(notification: UserNotification):
+        """Return the FCM data payload and image URL for a notification."""
+        data = {
+            "notification_id": str(notification.id),
+            "type": notification.type.value,
+            "priority": notification.priority.value,
+        }
+        image_url = None
+        if notification.data:
+            # Merge the extra data, then move image_url out of the data payload
+            data.update(notification.data)
+            image_url = data.pop('image_url', None)
+        return data, image_url
+
     @staticmethod
-    def _send_notification_sync(notification: UserNotification, db: Session, sound: Optional[str] = None) -> bool:
+    def _send_notification_sync(
+        notification: UserNotification,
+        db: Session,
+        sound: Optional[str] = None,
+        sent_at: Optional[datetime] = None
+    ) -> bool:
         try:
             fcm_token = FCMService.get_user_token(db, notification.user_id)
             if not fcm_token:
                 logger.warning(f"[SYNC] No FCM token found for user {notification.user_id}")
                 return False
 
-            # Extract image_url from data and remove it from data payload
-            image_url = None
-            data_without_image = {}
-            if notification.data:
-                for key, value in notification.data.items():
-                    if key == 'image_url':
-                        image_url = value
-                    else:
-                        data_without_image[key] = value
-
+            data, image_url = NotificationService._fcm_payload(notification)
             success = FCMService._send_notification_sync(
                 user_id=notification.user_id,
                 token=fcm_token,
                 title=notification.title,
                 body=notification.message,
-                data={
-                    "notification_id": str(notification.id),
-                    "type": notification.type.value,
-                    "priority": notification.priority.value,
-                    **data_without_image
-                },
+                data=data,
                 image=image_url,
                 sound=sound
             )
 
+            if success is None:
+                # An identical push went out moments ago; this one was not sent
+                logger.info(f"[SYNC] Skipped duplicate notification {notification.id}")
+                return False
             if success:
-                notification.sent_at = NotificationService.get_current_time()
-                db.commit()
+                NotificationService._mark_sent(db, [notification.id], sent_at)
                 logger.info(f"[SYNC] Successfully sent notification {notification.id}")
                 return True
             else:
@@ -196,30 +259,129 @@ class NotificationService:
             logger.error(f"[SYNC] Error sending notification {notification.id}: {str(e)}")
             return False
 
+    @staticmethod
+    def _mark_sent(db: Session, notification_ids: List[int], sent_at: Optional[datetime] = None):
+        """Set sent_at for all delivered notifications with a single UPDATE."""
+        if not notification_ids:
+            return
+        db.execute(
+            update(UserNotification)
+            .where(UserNotification.id.in_(notification_ids))
+            .values(sent_at=sent_at or NotificationService.get_current_time())
+        )
+        db.commit()
+
+    @staticmethod
+    def _send_batch_sync(
+        db: Session,
+        notifications: List[UserNotification],
+        sound: Optional[str] = None,
+        sent_at: Optional[datetime] = None
+    ) -> int:
+        """Send many notifications through FCM batch sends and mark the delivered ones as sent."""
+        # Build every message first so FCM gets them in batches instead of one request each
+        # One token query for the whole batch instead of one per notification
+        tokens = FCMService.get_user_tokens(db, [notification.user_id for notification in notifications])
+        batch_ids = []
+        messages = []
+        for notification in notifications:
+            fcm_token = tokens.get(notification.user_id)
+            if not fcm_token:
+                logger.warning(f"[SYNC] No FCM token found for user {notification.user_id}")
+                continue
+            data, image_url = NotificationService._fcm_payload(notification)
+            batch_ids.append(notification.id)
+            messages.append(FCMService.build_message(
+                fcm_token,
+                notification.title,
+                notification.message,
+                data,
+                image_url,
+                sound=sound
+            ))
+
+        if not messages:
+            return 0
+
+        # End the read transaction so no connection sits idle in it during the FCM round-trips
+        db.commit()
+        results = FCMService.send_each_sync(db, messages)
+        sent_ids = [notification_id for notification_id, success in zip(batch_ids, results) if success]
+        NotificationService._mark_sent(db, sent_ids, sent_at)
+        return len(sent_ids)
+
+    @staticmethod
+    async def _send_batch(
+        db: Session,
+        notifications: List[UserNotification],
+        sent_at: Optional[datetime] = None
+    ) -> int:
+        """Send many notifications concurrently and mark the delivered ones as sent."""
+        # One token query for the whole batch instead of one per notification
+        tokens = FCMService.get_user_tokens(db, [notification.user_id for notification in notifications])
+        batch_ids = []
+        targets = []
+        for notification in notifications:
+            fcm_token = tokens.get(notification.user_id)
+            if not fcm_token:
+                logger.warning(f"No FCM token found for user {notification.user_id}")
+                continue
+            data, image_url = NotificationService._fcm_payload(notification)
+            batch_ids.append(notification.id)
+            targets.append((fcm_token, notification.title, notification.message, data, image_url))
+
+        if not targets:
+            return 0
+
+        # End the read transaction so no connection sits idle in it during the FCM round-trips
+        db.commit()
+
+        # Sends run concurrently (bounded inside send_many_async); the session is only
+        # touched before and after, never from the concurrent sends themselves
+        results = await FCMService.send_many_async(db, targets)
+        sent_ids = [notification_id for notification_id, success in zip(batch_ids, results) if success]
+        NotificationService._mark_sent(db, sent_ids, sent_at)
+        return len(sent_ids)
+
+    @staticmethod
+    def _iter_pending_batches(db: Session, current_time: datetime, batch_size: int = FCM_MULTICAST_LIMIT):
+        """
+        Yield due, unsent notifications in batches ordered by (scheduled_for, id).
+
+        Keyset pagination keeps memory bounded by the batch size; unlike a server-side
+        cursor it survives the commits made while each batch is being sent.
+        """
+        last_key = None
+        while True:
+            stmt = select(UserNotification).where(
+                UserNotification.scheduled_for <= current_time,
+                UserNotification.sent_at.is_(None)
+            )
+            if last_key is not None:
+                stmt = stmt.where(tuple_(UserNotification.scheduled_for, UserNotification.id) > last_key)
+            stmt = stmt.order_by(UserNotification.scheduled_for, UserNotification.id).limit(batch_size)
+            batch = db.scalars(stmt).all()
+            if not batch:
+                return
+            last_key = (batch[-1].scheduled_for, batch[-1].id)
+            yield batch
+            if len(batch) < batch_size:
+                return
+
     @staticmethod
     def send_scheduled_notifications_sync(db: Session):
         """Synchronous version of send_scheduled_notifications for background tasks."""
         try:
             current_time = NotificationService.get_current_time()
             
-            # Get all pending scheduled notifications
-            pending_notifications = db.query(UserNotification).filter(
-                and_(
-                    UserNotification.scheduled_for <= current_time,
-                    UserNotification.sent_at.is_(None)
-                )
-            ).all()
-
+            # Work through the pending backlog one FCM batch at a time
+            processed_count = 0
             sent_count = 0
-            for notification in pending_notifications:
-                try:
-                    success = NotificationService._send_notification_sync(notification, db)
-                    if success:
-                        sent_count += 1
-                except Exception as e:
-                    logger.error(f"[SYNC] Error sending scheduled notification {notification.id}: {str(e)}")
+            for pending_notifications in NotificationService._iter_pending_batches(db, current_time):
+                processed_count += len(pending_notifications)
+                sent_count += NotificationService._send_batch_sync(db, pending_notifications, sent_at=current_time)
             
-            logger.info(f"[SYNC] Processed {len(pending_notifications)} scheduled notifications, sent {sent_count}")
+            logger.info(f"[SYNC] Processed {processed_count} scheduled notifications, sent {sent_count}")
             return sent_count
             
         except Exception as e:
@@ -232,105 +394,113 @@ class NotificationService:
         try:
             current_time = NotificationService.get_current_time()
             
-            # Get all pending scheduled notifications
-            pending_notifications = db.query(UserNotification).filter(
-                and_(
-                    UserNotification.scheduled_for <= current_time,
-                    UserNotification.sent_at.is_(None)
-                )
-            ).all()
-
+            # Work through the pending backlog one FCM batch at a time
+            processed_count = 0
             sent_count = 0
-            for notification in pending_notifications:
-                try:
-                    success = await NotificationService._send_notification(notification, db)
-                    if success:
-                        sent_count += 1
-                except Exception as e:
-                    logger.error(f"Error sending scheduled notification {notification.id}: {str(e)}")
+            for pending_notifications in NotificationService._iter_pending_batches(db, current_time):
+                processed_count += len(pending_notifications)
+                sent_count += await NotificationService._send_batch(db, pending_notifications, sent_at=current_time)
             
-            logger.info(f"Processed {len(pending_notifications)} scheduled notifications, sent {sent_count}")
+            logger.info(f"Processed {processed_count} scheduled notifications, sent {sent_count}")
             return sent_count
             
         except Exception as e:
             logger.error(f"Error processing scheduled notifications: {str(e)}")
             return 0
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _daily_update_content(crop_name: str, current_week: int, week_title: str) -> tuple:
+        """Render the daily update title and message, shared by every user on the same crop week."""
+        return (
+            f"Daily Update - {crop_name} (Week {current_week})",
+            f"{week_title} 👋 Here's your tip Today!!",
+        )
+
+    @staticmethod
+    def _get_daily_update_rows(db: Session):
+        """
+        Load every user due a daily update with their tracking, current week and
+        localized week/crop content in a single joined query.
+
+        Plain columns are selected so the per-user commits while sending do not
+        expire (and lazily reload) the rows still to be processed.
+        """
+        language = func.coalesce(User.preferred_language, 'en')
+        stmt = select(
+            User.id.label("user_id"),
+            UserCropTracking.crop_id,
+            UserCropTracking.current_week,
+            Week.image_urls,
+            WeekTranslation.title.label("week_title"),
+            CropTranslation.name.label("crop_name"),
+            CropTranslation.variety.label("crop_variety")
+        ).join(
+            UserCropTracking, User.current_crop_tracking_id == UserCropTracking.id
+        ).join(
+            Week, and_(
+                Week.crop_id == UserCropTracking.crop_id,
+                Week.week_number == UserCropTracking.current_week
+            )
+        ).join(
+            WeekTranslation, and_(
+                WeekTranslation.week_id == Week.id,
+                WeekTranslation.language == language
+            )
+        ).join(
+            CropTranslation, and_(
+                CropTranslation.crop_id == UserCropTracking.crop_id,
+                CropTranslation.language == language
+            )
+        ).where(
+            text(DAILY_UPDATES_SUBSCRIBED_SQL)
+        )
+        return db.execute(stmt).all()
+
+    @staticmethod
+    def _daily_update_notification_rows(rows, created_at: datetime) -> List[Dict[str, Any]]:
+        """Build the user_notifications rows for the daily update jobs."""
+        notification_rows = []
+        for row in rows:
+            title, message = NotificationService._daily_update_content(
+                row.crop_name, row.current_week, row.week_title
+            )
+            notification_rows.append({
+                "user_id": row.user_id,
+                "type": NotificationType.DAILY_UPDATE,
+                "priority": NotificationPriority.MEDIUM,
+                "title": title,
+                "message": message,
+                "data": {
+                    "crop_id": row.crop_id,
+                    "week_number": row.current_week,
+                    "crop_name": row.crop_name,
+                    "crop_variety": row.crop_variety,
+                    "image_url": row.image_urls[0] if row.image_urls else None,
+                    "deeplink": f"/crops?crop_id={row.crop_id}&week_number={row.current_week}"
+                },
+                "created_at": created_at,
+            })
+        return notification_rows
+
     @staticmethod
     def send_daily_crop_updates_sync(db: Session):
         """Synchronous version of send_daily_crop_updates for background tasks."""
         try:
-            # Get users who want daily updates
-            users_query = db.query(User).filter(
-                cast(User.notification_settings.op('->')('notification_types').op('->>')('daily_updates'), Boolean) == True,
-                cast(User.notification_settings.op('->>')('push_notifications'), Boolean) == True
-            )
-            logger.info(f"[SYNC] Found {users_query.count()} users for daily crop updates")
-            if users_query.count() == 0:
+            # Get users who want daily updates together with their current week content
+            rows = NotificationService._get_daily_update_rows(db)
+            logger.info(f"[SYNC] Found {len(rows)} users for daily crop updates")
+            if not rows:
                 logger.info("[SYNC] No users subscribed for daily crop updates")
                 return 0
 
-            sent_count = 0
-            for user in users_query.all():
-                try:
-                    if not user.current_crop_tracking_id:
-                        continue
-                    # Get user's active crop tracking
-                    crop_tracking = db.query(UserCropTracking).filter(
-                        UserCropTracking.id == user.current_crop_tracking_id,
-                    ).first()
-
-                    if not crop_tracking:
-                        continue
-
-                    # Get current week data
-                    current_week = db.query(Week).filter(
-                        Week.crop_id == crop_tracking.crop_id,
-                        Week.week_number == crop_tracking.current_week
-                    ).first()
-
-                    if not current_week:
-                        continue
-
-                    # Get localized content
-                    language = user.preferred_language or 'en'
-                    week_translation = db.query(WeekTranslation).filter(
-                        WeekTranslation.week_id == current_week.id,
-                        WeekTranslation.language == language
-                    ).first()
-
-                    crop_translation = db.query(CropTranslation).filter(
-                        CropTranslation.crop_id == crop_tracking.crop_id,
-                        CropTranslation.language == language
-                    ).first()
-
-                    if not week_translation:
-                        continue
-                    
-
-                    logger.info(f"[SYNC] Sending daily update to user {user.id} for crop {crop_tracking.crop_id}, week {crop_tracking.current_week}")
-                    # Create and send notification
-                    NotificationService.create_and_send_notification_sync(
-                        db=db,
-                        user_id=user.id,
-                        type=NotificationType.DAILY_UPDATE,
-                        title=f"Daily Update - {crop_translation.name} (Week {crop_tracking.current_week})",
-                        message=f"{week_translation.title} 👋 Here's your tip Today!!",
-                        priority=NotificationPriority.MEDIUM,
-                        data={
-                            "crop_id": crop_tracking.crop_id,
-                            "week_number": crop_tracking.current_week,
-                            "crop_name": crop_translation.name,
-                            "crop_variety": crop_translation.variety,
-                            "image_url": current_week.image_urls[0] if len(current_week.image_urls) > 0 else None,
-                            "deeplink": f"/crops?crop_id={crop_tracking.crop_id}&week_number={crop_tracking.current_week}"
-                        },
-                        sound="sound1"
-                    )
-                    sent_count += 1
-
-                except Exception as e:
-                    logger.error(f"[SYNC] Error sending daily update to user {user.id}: {str(e)}")
+            # Stage every notification and insert them all in one statement
+            created_at = NotificationService.get_current_time()
+            notifications = NotificationService.create_notifications_bulk(
+                db, NotificationService._daily_update_notification_rows(rows, created_at)
+            )
+
+            sent_count = NotificationService._send_batch_sync(db, notifications, sound="sound1", sent_at=created_at)
 
             logger.info(f"[SYNC] Sent {sent_count} daily crop update notifications")
             return sent_count
@@ -343,74 +513,19 @@ class NotificationService:
     async def send_daily_crop_updates(db: Session):
         """Send daily crop update notifications to users."""
         try:
-            # Get users who want daily updates
-            users_query = db.query(User).filter(
-                cast(User.notification_settings.op('->')('notification_types').op('->>')('daily_updates'), Boolean) == True,
-                cast(User.notification_settings.op('->>')('push_notifications'), Boolean) == True
-            )
-            logger.info(f"Found {users_query.count()} users for daily crop updates")
-            if users_query.count() == 0:
+            # Get users who want daily updates together with their current week content
+            rows = NotificationService._get_daily_update_rows(db)
+            logger.info(f"Found {len(rows)} users for daily crop updates")
+            if not rows:
                 logger.info("No users subscribed for daily crop updates")
                 return 0
 
-            sent_count = 0
-            for user in users_query.all():
-                try:
-                    if not user.current_crop_tracking_id:
-                        continue
-                    # Get user's active crop tracking
-                    crop_tracking = db.query(UserCropTracking).filter(
-                        UserCropTracking.id == user.current_crop_tracking_id,
-                    ).first()
-
-                    if not crop_tracking:
-                        continue
-
-                    # Get current week data
-                    current_week = db.query(Week).filter(
-                        Week.crop_id == crop_tracking.crop_id,
-                        Week.week_number == crop_tracking.current_week
-                    ).first()
-
-                    if not current_week:
-                        continue
-
-                    # Get localized content
-                    language = user.preferred_language or 'en'
-                    week_translation = db.query(WeekTranslation).filter(
-                        WeekTranslation.week_id == current_week.id,
-                        WeekTranslation.language == language
-                    ).first()
-
-                    crop_translation = db.query(CropTranslation).filter(
-                        CropTranslation.crop_id == crop_tracking.crop_id,
-                        CropTranslation.language == language
-                    ).first()
-
-                    if not week_translation:
-                        continue
-                    
-
-                    logger.info(f"Sending daily update to user {user.id} for crop {crop_tracking.crop_id}, week {crop_tracking.current_week}")
-                    # Create and send notification
-                    await NotificationService.create_and_send_notification(
-                        db=db,
-                        user_id=user.id,
-                        type=NotificationType.DAILY_UPDATE,
-                        title=f"Daily Update - {crop_translation.name} (Week {crop_tracking.current_week})",
-                        message=f"{week_translation.title} 👋 Here's your tip Today!!",
-                        priority=NotificationPriority.MEDIUM,
-                        data={
-                            "crop_id": crop_tracking.crop_id,
-                            "week_number": crop_tracking.current_week,
-                            "crop_name": crop_translation.name,
-                            "crop_variety": crop_translation.variety,
-                        }
-                    )
-                    sent_count += 1
-
-                except Exception as e:
-                    logger.error(f"Error sending daily update to user {user.id}: {str(e)}")
+            created_at = NotificationService.get_current_time()
+            notifications = NotificationService.create_notifications_bulk(
+                db, NotificationService._daily_update_notification_rows(rows, created_at)
+            )
+
+            sent_count = await NotificationService._send_batch(db, notifications, sent_at=created_at)
 
             logger.info(f"Sent {sent_count} daily crop update notifications")
             return sent_count
@@ -497,15 +612,7 @@ class NotificationService:
         unread_only: bool = False
     ) -> List[UserNotification]:
         """Get notifications for a user."""
-        query = db.query(UserNotification).filter(UserNotification.user_id == user_id)
-        
-        if type:
-            query = query.filter(UserNotification.type == type)
-        
-        if unread_only:
-            query = query.filter(UserNotification.is_read == False)
-        
-        return query.order_by(UserNotification.created_at.desc()).offset(skip).limit(limit).all()
+        return NotificationService.get_user_notifications_sync(db, user_id, skip, limit, type, unread_only)
 
     @staticmethod
     def get_user_notifications_sync(
@@ -530,65 +637,33 @@ class NotificationService:
     @staticmethod
     async def mark_notification_as_read(db: Session, notification_id: int, user_id: int) -> bool:
         """Mark a notification as read."""
-        try:
-            notification = db.query(UserNotification).filter(
-                UserNotification.id == notification_id,
-                UserNotification.user_id == user_id
-            ).first()
-            
-            if not notification:
-                return False
-            
-            notification.is_read = True
-            notification.read_at = NotificationService.get_current_time()
-            db.commit()
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error marking notification as read: {str(e)}")
-            return False
+        return NotificationService.mark_notification_as_read_sync(db, notification_id, user_id)
 
     @staticmethod
     def mark_notification_as_read_sync(db: Session, notification_id: int, user_id: int) -> bool:
         """Synchronous version of mark_notification_as_read for background tasks."""
         try:
-            notification = db.query(UserNotification).filter(
-                UserNotification.id == notification_id,
-                UserNotification.user_id == user_id
-            ).first()
-            
-            if not notification:
-                return False
-            
-            notification.is_read = True
-            notification.read_at = NotificationService.get_current_time()
+            # A single UPDATE; no matching row means the notification was not found
+            result = db.execute(
+                update(UserNotification)
+                .where(
+                    UserNotification.id == notification_id,
+                    UserNotification.user_id == user_id
+                )
+                .values(is_read=True, read_at=NotificationService.get_current_time())
+            )
             db.commit()
             
-            return True
+            return result.rowcount > 0
             
         except Exception as e:
-            logger.error(f"[SYNC] Error marking notification as read: {str(e)}")
+            logger.error(f"Error marking notification as read: {str(e)}")
             return False
 
     @staticmethod
     async def mark_all_notifications_as_read(db: Session, user_id: int) -> int:
         """Mark all notifications as read for a user."""
-        try:
-            updated_count = db.query(UserNotification).filter(
-                UserNotification.user_id == user_id,
-                UserNotification.is_read == False
-            ).update({
-                "is_read": True,
-                "read_at": NotificationService.get_current_time()
-            })
-            
-            db.commit()
-            return updated_count
-            
-        except Exception as e:
-            logger.error(f"Error marking all notifications as read: {str(e)}")
-            return 0
+        return NotificationService.mark_all_notifications_as_read_sync(db, user_id)
 
     @staticmethod
     def mark_all_notifications_as_read_sync(db: Session, user_id: int) -> int:
@@ -606,5 +681,5 @@ class NotificationService:
             return updated_count
             
         except Exception as e:
-            logger.error(f"[SYNC] Error marking all notifications as read: {str(e)}")
-            return 0
\ No newline at end of file
+            logger.error(f"Error marking all notifications as read: {str(e)}")
+            return 0
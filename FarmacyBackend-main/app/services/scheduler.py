@@ -15,15 +15,19 @@ from firebase_admin._messaging_utils import UnregisteredError
 # Define Indian timezone offset
 INDIAN_TIMEZONE = timezone(timedelta(hours=5, minutes=30))
 
+# All test users are served by one job that ticks at the smallest allowed interval
+TEST_BROADCAST_JOB_ID = 'test_broadcast'
+TEST_BROADCAST_TICK_SECONDS = 10
+
 class NotificationScheduler:
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(NotificationScheduler, cls).__new__(cls)
-            cls._instance.scheduler = AsyncIOScheduler(timezone=INDIAN_TIMEZONE)
-            cls._instance.test_users = set()  # Track users in test mode
-        return cls._instance
+    def __init__(self):
+        # Collapse missed runs into one and never overlap a job with itself
+        self.scheduler = AsyncIOScheduler(
+            timezone=INDIAN_TIMEZONE,
+            job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 30}
+        )
+        self.test_users = set()  # Track users in test mode
+        self.test_jobs = {}  # user_id -> kind, interval, next_run
 
     async def start(self):
         """Start the scheduler with all jobs."""
@@ -74,18 +78,26 @@ class NotificationScheduler:
         """Process all scheduled notifications that are due."""
         try:
             with get_db_session() as db:
-                NotificationService.send_scheduled_notifications_sync(db)
+                # The async path sends each batch concurrently instead of blocking the event loop
+                await NotificationService.send_scheduled_notifications(db)
         except Exception as e:
             logger.error(f"Error in scheduled notifications job: {str(e)}")
 
     async def _send_daily_crop_updates(self):
         """Send daily crop update notifications."""
         try:
-            with get_db_session() as db:
-                NotificationService.send_daily_crop_updates_sync(db)
+            # AsyncIOScheduler runs jobs on the app's event loop; the FCM batch sends and
+            # their retry backoff block, so run the whole job in a worker thread
+            await asyncio.to_thread(self._run_daily_crop_updates)
         except Exception as e:
             logger.error(f"Error in daily crop updates job: {str(e)}")
 
+    @staticmethod
+    def _run_daily_crop_updates():
+        # The session is created and used entirely inside the worker thread
+        with get_db_session() as db:
+            NotificationService.send_daily_crop_updates_sync(db)
+
     async def _send_system_alerts(self):
         """Send system alert notifications if needed."""
         try:
@@ -129,22 +141,67 @@ class NotificationScheduler:
         except Exception as e:
             logger.error(f"Error scheduling notification: {str(e)}")
 
+    def _start_test_job(self, user_id: int, kind: str, interval_seconds: int):
+        """Register a user with the shared test broadcast job."""
+        self.test_users.add(user_id)
+        self.test_jobs[user_id] = {
+            "kind": kind,
+            "interval": interval_seconds,
+            "next_run": datetime.now(INDIAN_TIMEZONE) + timedelta(seconds=interval_seconds)
+        }
+        if self.scheduler.get_job(TEST_BROADCAST_JOB_ID) is None:
+            self.scheduler.add_job(
+                self._broadcast_test,
+                IntervalTrigger(seconds=TEST_BROADCAST_TICK_SECONDS),
+                id=TEST_BROADCAST_JOB_ID,
+                replace_existing=True
+            )
+
+    def _stop_test_job(self, user_id: int):
+        """Remove a user from the test broadcast, dropping the job once nobody is left."""
+        self.test_users.discard(user_id)
+        self.test_jobs.pop(user_id, None)
+        if not self.test_jobs and self.scheduler.get_job(TEST_BROADCAST_JOB_ID) is not None:
+            self.scheduler.remove_job(TEST_BROADCAST_JOB_ID)
+
+    async def _broadcast_test(self):
+        """Send test notifications/updates to every test user whose interval has elapsed."""
+        current_time = datetime.now(INDIAN_TIMEZONE)
+        due = []
+        for user_id, job in list(self.test_jobs.items()):
+            if job["next_run"] <= current_time:
+                # Advance from the schedule rather than from this tick, so intervals that
+                # are not a multiple of the tick keep their rate instead of rounding up
+                interval = timedelta(seconds=job["interval"])
+                job["next_run"] += interval
+                if job["next_run"] <= current_time:
+                    # Several runs were missed; skip to the next one still ahead
+                    job["next_run"] += interval * ((current_time - job["next_run"]) // interval + 1)
+                due.append((user_id, job["kind"]))
+        if not due:
+            return
+
+        rows = []
+        for user_id, kind in due:
+            if kind == "updates":
+                rows.extend(self._test_update_rows(user_id, current_time))
+            else:
+                rows.extend(self._test_notification_rows(user_id, current_time))
+
+        # One session, one INSERT and one FCM batch for the whole tick
+        try:
+            with get_db_session() as db:
+                sent_count = await NotificationService.create_and_send_notifications_bulk(db, rows, now=current_time)
+            logger.info(f"Sent {sent_count}/{len(rows)} test notifications to {len(due)} users")
+        except Exception as e:
+            logger.error(f"Error in test broadcast job: {str(e)}")
+
     def start_test_notifications(self, user_id: int, interval_seconds: int = 30):
         """Start sending test notifications to a user."""
         if user_id in self.test_users:
             return  # Already running
             
-        self.test_users.add(user_id)
-        
-        # Schedule recurring test notifications
-        job_id = f'test_notifications_{user_id}'
-        self.scheduler.add_job(
-            self._send_test_notification,
-            IntervalTrigger(seconds=interval_seconds),
-            args=[user_id],
-            id=job_id,
-            replace_existing=True
-        )
+        self._start_test_job(user_id, "notifications", interval_seconds)
         
         logger.info(f"Started test notifications for user {user_id} every {interval_seconds} seconds")
 
@@ -153,110 +210,72 @@ class NotificationScheduler:
         if user_id not in self.test_users:
             return
             
-        self.test_users.discard(user_id)
-        
-        # Remove the job
-        job_id = f'test_notifications_{user_id}'
         try:
-            self.scheduler.remove_job(job_id)
+            self._stop_test_job(user_id)
             logger.info(f"Stopped test notifications for user {user_id}")
         except Exception as e:
             logger.error(f"Error stopping test notifications for user {user_id}: {str(e)}")
 
-    async def _send_test_notification(self, user_id: int):
-        """Send a test notification to a user."""
-        if user_id not in self.test_users:
-            # User stopped test mode, remove job
-            self.stop_test_notifications(user_id)
-            return
-            
-        try:
-            with get_db_session() as db:
-                current_time = datetime.now(INDIAN_TIMEZONE)
-                NotificationService.create_and_send_notification_sync(
-                    db=db,
-                    user_id=user_id,
-                    type=NotificationType.SYSTEM_ALERT,
-                    title="Test Notification",
-                    message=f"Test notification sent at {current_time.strftime('%H:%M:%S')} IST",
-                    priority=NotificationPriority.MEDIUM,
-                    data={
-                        "test": True,
-                        "timestamp": current_time.isoformat()
-                    }
-                )
-        except Exception as e:
-            logger.error(f"Error sending test notification to user {user_id}: {str(e)}")
+    def _test_notification_rows(self, user_id: int, current_time: datetime) -> list:
+        """Build the test notification for a user."""
+        return [{
+            "user_id": user_id,
+            "type": NotificationType.SYSTEM_ALERT,
+            "title": "Test Notification",
+            "message": f"Test notification sent at {current_time.strftime('%H:%M:%S')} IST",
+            "priority": NotificationPriority.MEDIUM,
+            "data": {
+                "test": True,
+                "timestamp": current_time.isoformat()
+            }
+        }]
 
-    async def _send_test_updates(self, user_id: int):
-        """Send test updates simulating daily and weather updates."""
-        if user_id not in self.test_users:
-            return
-            
-        try:
-            with get_db_session() as db:
-                current_time = datetime.now(INDIAN_TIMEZONE)
-                
-                # Simulate daily crop update
-                NotificationService.create_and_send_notification_sync(
-                    db=db,
-                    user_id=user_id,
-                    type=NotificationType.DAILY_UPDATE,
-                    title="Test Daily Update",
-                    message=f"Test daily update for your crops at {current_time.strftime('%H:%M:%S')} IST",
-                    priority=NotificationPriority.MEDIUM,
-                    data={
-                        "test": True,
-                        "type": "daily_update",
-                        "timestamp": current_time.isoformat(),
-                        "crop_id": 1,
-                        "week_number": 2,
-                        "crop_name": "Test Crop"
-                    }
-                )
-                
-                # Simulate weather update
-                weather_conditions = ["Sunny", "Rainy", "Cloudy", "Windy"]
-                current_weather = weather_conditions[current_time.second % len(weather_conditions)]
-                
-                NotificationService.create_and_send_notification_sync(
-                    db=db,
-                    user_id=user_id,
-                    type=NotificationType.WEATHER_ALERT,
-                    title="Test Weather Update",
-                    message=f"Test weather update: {current_weather} conditions at {current_time.strftime('%H:%M:%S')} IST",
-                    priority=NotificationPriority.HIGH,
-                    data={
-                        "test": True,
-                        "type": "weather_update",
-                        "timestamp": current_time.isoformat(),
-                        "weather": current_weather,
-                        "temperature": 25 + (current_time.second % 10),
-                        "humidity": 60 + (current_time.second % 20)
-                    }
-                )
-                
-                logger.info(f"Sent test updates to user {user_id}")
-                
-        except Exception as e:
-            logger.error(f"Error sending test updates to user {user_id}: {str(e)}")
+    def _test_update_rows(self, user_id: int, current_time: datetime) -> list:
+        """Build the test updates simulating daily and weather updates for a user."""
+        weather_conditions = ["Sunny", "Rainy", "Cloudy", "Windy"]
+        current_weather = weather_conditions[current_time.second % len(weather_conditions)]
+        
+        return [
+            # Simulate daily crop update
+            {
+                "user_id": user_id,
+                "type": NotificationType.DAILY_UPDATE,
+                "title": "Test Daily Update",
+                "message": f"Test daily update for your crops at {current_time.strftime('%H:%M:%S')} IST",
+                "priority": NotificationPriority.MEDIUM,
+                "data": {
+                    "test": True,
+                    "type": "daily_update",
+                    "timestamp": current_time.isoformat(),
+                    "crop_id": 1,
+                    "week_number": 2,
+                    "crop_name": "Test Crop"
+                }
+            },
+            # Simulate weather update
+            {
+                "user_id": user_id,
+                "type": NotificationType.WEATHER_ALERT,
+                "title": "Test Weather Update",
+                "message": f"Test weather update: {current_weather} conditions at {current_time.strftime('%H:%M:%S')} IST",
+                "priority": NotificationPriority.HIGH,
+                "data": {
+                    "test": True,
+                    "type": "weather_update",
+                    "timestamp": current_time.isoformat(),
+                    "weather": current_weather,
+                    "temperature": 25 + (current_time.second % 10),
+                    "humidity": 60 + (current_time.second % 20)
+                }
+            }
+        ]
 
     def start_test_updates(self, user_id: int, interval_seconds: int = 30):
         """Start sending test updates to a user."""
         if user_id in self.test_users:
             return  # Already running
             
-        self.test_users.add(user_id)
-        
-        # Schedule recurring test updates
-        job_id = f'test_updates_{user_id}'
-        self.scheduler.add_job(
-            self._send_test_updates,
-            IntervalTrigger(seconds=interval_seconds),
-            args=[user_id],
-            id=job_id,
-            replace_existing=True
-        )
+        self._start_test_job(user_id, "updates", interval_seconds)
         
         logger.info(f"Started test updates for user {user_id} every {interval_seconds} seconds")
 
@@ -265,16 +284,24 @@ class NotificationScheduler:
         if user_id not in self.test_users:
             return
             
-        self.test_users.discard(user_id)
-        
-        # Remove the job
-        job_id = f'test_updates_{user_id}'
         try:
-            self.scheduler.remove_job(job_id)
+            self._stop_test_job(user_id)
             logger.info(f"Stopped test updates for user {user_id}")
         except Exception as e:
             logger.error(f"Error stopping test updates for user {user_id}: {str(e)}")
 
+    def get_test_job(self, user_id: int) -> Optional[dict]:
+        """Get information about a user's test job, if one is running."""
+        job = self.test_jobs.get(user_id)
+        if job is None:
+            return None
+        return {
+            "id": f"test_{job['kind']}_{user_id}",
+            "name": job["kind"],
+            "next_run": job["next_run"].isoformat(),
+            "trigger": f"interval[{timedelta(seconds=job['interval'])}]"
+        }
+
     def get_scheduled_jobs(self):
         """Get information about all scheduled jobs."""
         jobs = []
@@ -288,5 +315,5 @@ class NotificationScheduler:
         return jobs
 
 
-# Create global scheduler instance
+# Create global scheduler instance; import this rather than constructing another
 notification_scheduler = NotificationScheduler()
\ No newline at end of file
@@ -1,16 +1,41 @@
-import requests
+import asyncio
+import httpx
 import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from abc import ABC, abstractmethod
 
 from app.core.config import settings
 from app.core.logger import logger
 
+_sms_http: Optional[httpx.AsyncClient] = None
+
+# How long the primary provider gets before a fallback provider is raced against it
+SMS_HEDGE_DELAY_SEC = 2.0
+
+
+def _get_sms_http() -> httpx.AsyncClient:
+    global _sms_http
+    if _sms_http is None:
+        _sms_http = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=32),
+            transport=httpx.AsyncHTTPTransport(retries=2)
+        )
+    return _sms_http
+
+
+async def close_sms_http():
+    """Close the shared SMS HTTP client (called on application shutdown)."""
+    global _sms_http
+    if _sms_http is not None:
+        await _sms_http.aclose()
+        _sms_http = None
+
 class SMSService(ABC):
     """Abstract base class for SMS services"""
     
     @abstractmethod
-    def send_sms(self, phone_number: str, message: str) -> bool:
+    async def send_sms(self, phone_number: str, message: str) -> bool:
         """Send SMS to the given phone number"""
         pass
     
@@ -27,28 +52,31 @@ class TwilioSMSService(SMSService):
         self.auth_token = getattr(settings, 'TWILIO_AUTH_TOKEN', None)
         self.from_number = getattr(settings, 'TWILIO_PHONE_NUMBER', None)
         
-        if not all([self.account_sid, self.auth_token, self.from_number]):
+        # Resolved once here instead of on every send
+        self._configured = all([self.account_sid, self.auth_token, self.from_number])
+        self._auth = httpx.BasicAuth(self.account_sid or "", self.auth_token or "")
+        self._url = f"https://api.twilio.com/2010-04-01/Accounts/{self.account_sid}/Messages.json"
+        
+        if not self._configured:
             logger.warning("Twilio credentials not configured")
     
-    def send_sms(self, phone_number: str, message: str) -> bool:
+    async def send_sms(self, phone_number: str, message: str) -> bool:
         """Send SMS using Twilio"""
         try:
-            if not all([self.account_sid, self.auth_token, self.from_number]):
+            if not self._configured:
                 logger.error("Twilio credentials not configured")
                 return False
             
-            url = f"https://api.twilio.com/2010-04-01/Accounts/{self.account_sid}/Messages.json"
-            
             payload = {
                 'To': phone_number,
                 'From': self.from_number,
                 'Body': message
             }
             
-            response = requests.post(
-                url,
+            response = await _get_sms_http().post(
+                self._url,
                 data=payload,
-                auth=(self.account_sid, self.auth_token)
+                auth=self._auth
             )
             
             if response.status_code == 201:
@@ -68,39 +96,44 @@ class TwilioSMSService(SMSService):
 class MSG91Service(SMSService):
     """MSG91 SMS service implementation (Popular in India)"""
     
+    URL = "https://api.msg91.com/api/v5/flow/"
+    
     def __init__(self):
         self.api_key = getattr(settings, 'MSG91_API_KEY', None)
         self.sender_id = getattr(settings, 'MSG91_SENDER_ID', 'FARMACY')
         self.template_id = getattr(settings, 'MSG91_TEMPLATE_ID', None)
         
-        if not self.api_key:
+        # Resolved once here instead of on every send
+        self._configured = bool(self.api_key)
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authkey": self.api_key or ""
+        }
+        self._payload_base = {
+            "flow_id": self.template_id,
+            "sender": self.sender_id
+        }
+        
+        if not self._configured:
             logger.warning("MSG91 API key not configured")
     
-    def send_sms(self, phone_number: str, message: str) -> bool:
+    async def send_sms(self, phone_number: str, message: str) -> bool:
         """Send SMS using MSG91"""
         try:
-            if not self.api_key:
+            if not self._configured:
                 logger.error("MSG91 API key not configured")
                 return False
             
             # Remove country code for MSG91
             clean_number = phone_number.replace('+91', '')
             
-            url = "https://api.msg91.com/api/v5/flow/"
-            
             payload = {
-                "flow_id": self.template_id,
-                "sender": self.sender_id,
+                **self._payload_base,
                 "mobiles": clean_number,
                 "VAR1": message  # OTP code
             }
             
-            headers = {
-                "Content-Type": "application/json",
-                "Authkey": self.api_key
-            }
-            
-            response = requests.post(url, json=payload, headers=headers)
+            response = await _get_sms_http().post(self.URL, json=payload, headers=self._headers)
             
             if response.status_code == 200:
                 result = response.json()
@@ -125,9 +158,19 @@ class SMSManager:
     """Manager class to handle SMS sending with multiple providers"""
     
     def __init__(self):
+        self.reload()
+    
+    def reload(self):
+        """(Re)build the providers from settings, e.g. after credentials change"""
         self.services = {}
         self.primary_service = None
         self._initialize_services()
+        
+        # Derived once here; the provider set only changes through reload()
+        self._available_services = {name: service.get_service_name() for name, service in self.services.items()}
+        self._fallback_service = next(
+            (service for name, service in self.services.items() if name != self.primary_service), None
+        )
     
     def _initialize_services(self):
         """Initialize available SMS services"""
@@ -157,27 +200,54 @@ class SMSManager:
         # except Exception as e:
         #     logger.warning(f"Failed to initialize Twilio: {str(e)}")
     
-    def send_sms(self, phone_number: str, message: str, service_name: Optional[str] = None) -> bool:
+    async def send_sms(self, phone_number: str, message: str, service_name: Optional[str] = None) -> bool:
         """Send SMS using the specified service or primary service"""
         
         if service_name and service_name in self.services:
-            service = self.services[service_name]
-        elif self.primary_service:
-            service = self.services[self.primary_service]
-        else:
+            return await self.services[service_name].send_sms(phone_number, message)
+        if not self.primary_service:
             logger.error("No SMS service available")
             return False
         
-        return service.send_sms(phone_number, message)
+        primary = self.services[self.primary_service]
+        if self._fallback_service is None:
+            return await primary.send_sms(phone_number, message)
+        return await self._send_hedged(primary, self._fallback_service, phone_number, message)
     
-    def send_otp_sms(self, phone_number: str, otp_code: str, service_name: Optional[str] = None) -> bool:
+    async def _send_hedged(self, primary: SMSService, fallback: SMSService, phone_number: str, message: str) -> bool:
+        """Send via the primary, racing the fallback if the primary is slow, and keep the first success"""
+        primary_task = asyncio.create_task(primary.send_sms(phone_number, message))
+        try:
+            if await asyncio.wait_for(asyncio.shield(primary_task), timeout=SMS_HEDGE_DELAY_SEC):
+                return True
+            # Primary failed outright, so there is nothing to race
+            return await fallback.send_sms(phone_number, message)
+        except asyncio.TimeoutError:
+            logger.warning(f"{primary.get_service_name()} slow, also sending via {fallback.get_service_name()}")
+        
+        pending = {primary_task, asyncio.create_task(fallback.send_sms(phone_number, message))}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if any(task.result() for task in done):
+                for task in pending:
+                    task.cancel()
+                return True
+        return False
+    
+    async def send_bulk(self, items: List[Tuple[str, str]], service_name: Optional[str] = None) -> List[bool]:
+        """Send many SMS concurrently over the shared connection pool"""
+        return list(await asyncio.gather(
+            *(self.send_sms(phone_number, message, service_name) for phone_number, message in items)
+        ))
+    
+    async def send_otp_sms(self, phone_number: str, otp_code: str, service_name: Optional[str] = None) -> bool:
         """Send OTP SMS with formatted message"""
         message = f"Your Farmacy verification code is: {otp_code}. Valid for 5 minutes."
-        return self.send_sms(phone_number, message, service_name)
+        return await self.send_sms(phone_number, message, service_name)
     
     def get_available_services(self) -> Dict[str, str]:
         """Get list of available SMS services"""
-        return {name: service.get_service_name() for name, service in self.services.items()}
+        return dict(self._available_services)
     
     def get_primary_service(self) -> Optional[str]:
         """Get the name of the primary SMS service"""
@@ -186,10 +256,14 @@ class SMSManager:
 # Global SMS manager instance
 sms_manager = SMSManager()
 
-def send_sms(phone_number: str, message: str, service_name: Optional[str] = None) -> bool:
+async def send_sms(phone_number: str, message: str, service_name: Optional[str] = None) -> bool:
     """Global function to send SMS"""
-    return sms_manager.send_sms(phone_number, message, service_name)
+    return await sms_manager.send_sms(phone_number, message, service_name)
+
+async def send_sms_bulk(items: List[Tuple[str, str]], service_name: Optional[str] = None) -> List[bool]:
+    """Global function to send many SMS concurrently"""
+    return await sms_manager.send_bulk(items, service_name)
 
-def send_otp_sms(phone_number: str, otp_code: str, service_name: Optional[str] = None) -> bool:
+async def send_otp_sms(phone_number: str, otp_code: str, service_name: Optional[str] = None) -> bool:
     """Global function to send OTP SMS"""
-    return sms_manager.send_otp_sms(phone_number, otp_code, service_name)
+    return await sms_manager.send_otp_sms(phone_number, otp_code, service_name)
@@ -1,8 +1,9 @@
 from app.core.logger import logger
+import httpx
 from supabase import create_client, Client
 from fastapi import UploadFile
 import os,io
-import calendar
+import secrets
 import time
 from app.core.config import settings
 from typing import Tuple, Optional
@@ -11,15 +12,42 @@ from app.core.logger import logger
 
 
 supabase = None
+_storage_http: Optional[httpx.AsyncClient] = None
+
+
+def _get_storage_http() -> httpx.AsyncClient:
+    global _storage_http
+    if _storage_http is None:
+        _storage_http = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            transport=httpx.AsyncHTTPTransport(retries=2)
+        )
+    return _storage_http
+
+
+async def close_storage_http():
+    """Close the shared Supabase storage HTTP client (called on application shutdown)."""
+    global _storage_http
+    if _storage_http is not None:
+        await _storage_http.aclose()
+        _storage_http = None
+
+
+def _storage_headers() -> dict:
+    return {
+        "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+        "apikey": settings.SUPABASE_KEY,
+    }
 
 def init_supabase():
     global supabase
     try:
         if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
             raise ValueError("Supabase URL and key must be configured")
+        # No connectivity probe here: creating the client does no I/O and the first
+        # storage request surfaces any connection problem
         supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-        # Test the connection by trying to access the storage
-        supabase.storage.list_buckets()
         logger.info("Supabase client initialized successfully")
     except Exception as e:
         logger.error(f"Supabase initialization error: {str(e)}")
@@ -30,26 +58,24 @@ class StorageService:
     async def upload_image(user_id: int, image, image_bytes, folder: str = "predictions") -> str:
         """Upload image to Supabase storage under user's folder."""
         try:
-            if not supabase:
-                raise ValueError("Supabase client not initialized. Call init_supabase() first.")
-
             # Read image bytes
             if not image_bytes:
                 raise ValueError("Uploaded image is empty.")
             logger.debug(f"Uploading file of size: {len(image_bytes)} bytes")
 
-            # Generate unique filename
-            timestamp = calendar.timegm(time.gmtime())
+            # Generate unique filename; the random suffix keeps same-instant uploads apart
             file_ext = image.filename.split('.')[-1]
-            file_path = f"{folder}/{user_id}/{timestamp}.{file_ext}"
+            file_path = f"{folder}/{user_id}/{time.time_ns()}_{secrets.token_hex(4)}.{file_ext}"
 
-            # Upload to Supabase
-            response = supabase.storage.from_(settings.SUPABASE_BUCKET).upload(
-                file_path, image_bytes, {"content-type": image.content_type}
+            # Upload through the storage REST API so the event loop is not blocked
+            response = await _get_storage_http().post(
+                f"{settings.SUPABASE_URL}/storage/v1/object/{settings.SUPABASE_BUCKET}/{file_path}",
+                content=image_bytes,
+                headers={**_storage_headers(), "Content-Type": image.content_type}
             )
 
-            if getattr(response, 'error', None):  # Safely check for error
-                error_msg = f"Upload error: {getattr(response.error, 'message', 'Unknown error')}"
+            if response.is_error:
+                error_msg = f"Upload error: {response.text}"
                 logger.error(error_msg)
                 return error_msg
 
@@ -67,12 +93,12 @@ class StorageService:
     async def delete_image(file_path: str) -> bool:
         """Delete image from Supabase storage."""
         try:
-            if not supabase:
-                raise ValueError("Supabase client not initialized. Call init_supabase() first.")
-
-            response = supabase.storage.from_(settings.SUPABASE_BUCKET).remove([file_path])
-            if getattr(response, 'error', None):
-                raise Exception(f"Delete error: {getattr(response.error, 'message', 'Unknown error')}")
+            response = await _get_storage_http().delete(
+                f"{settings.SUPABASE_URL}/storage/v1/object/{settings.SUPABASE_BUCKET}/{file_path}",
+                headers=_storage_headers()
+            )
+            if response.is_error:
+                raise Exception(f"Delete error: {response.text}")
             return True
         except Exception as e:
             error_msg = f"Failed to delete image: {str(e)}"
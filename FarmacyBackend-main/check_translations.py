@@ -1,6 +1,7 @@
+from sqlalchemy.orm import joinedload
 from app.database import get_db_session, init_db
 from app.models.user_personalization import UserCropTracking
-from app.models.crop import Week, WeekTranslation
+from app.models.crop import Week
 from datetime import date
 
 def check_translations():
@@ -25,12 +26,13 @@ def check_translations():
             # Calculate current day and week
             days_since_start = (date.today() - tracking.start_date).days
             current_week = (days_since_start // 7) + 1
-            current_day = (days_since_start % 7) + 1 + current_week * 7
+            current_day = days_since_start + 1  # day keys run continuously across weeks
             
             print(f"Current week: {current_week}, Current day: {current_day}")
             
             # Get week data
             week = db.query(Week)\
+                .options(joinedload(Week.translations))\
                 .filter(
                     Week.crop_id == tracking.crop_id,
                     Week.week_number == current_week
@@ -42,13 +44,9 @@ def check_translations():
             
             print(f"Found week: {week.__dict__}")
             
-            # Get all translations for this week
-            translations = db.query(WeekTranslation)\
-                .filter(WeekTranslation.week_id == week.id)\
-                .all()
-            
+            # Translations were loaded with the week
             print("\nAvailable translations:")
-            for trans in translations:
+            for trans in week.translations:
                 print(f"\nLanguage: {trans.language}")
                 print(f"Title: {trans.title}")
                 day_key = f"day_{current_day}"
@@ -1,5 +1,6 @@
+from sqlalchemy.orm import joinedload
 from app.database import get_db_session, init_db
-from app.models.crop import Week, WeekTranslation
+from app.models.crop import Week
 
 def check_weeks():
     try:
@@ -10,15 +11,15 @@ def check_weeks():
             print("Connected to database")
             
             # Get all weeks for crop ID 2
-            weeks = db.query(Week).filter(Week.crop_id == 2).all()
+            # Load every week with its translations in one query
+            weeks = db.query(Week).options(joinedload(Week.translations)).filter(Week.crop_id == 2).all()
             print(f"\nFound {len(weeks)} weeks for crop ID 2:")
             
             for week in weeks:
                 print(f"\nWeek {week.week_number}:")
-                translations = db.query(WeekTranslation).filter(WeekTranslation.week_id == week.id).all()
                 print(f"Stage ID: {week.stage_id}")
                 print("Translations:")
-                for trans in translations:
+                for trans in week.translations:
                     print(f"  Language: {trans.language}")
                     print(f"  Title: {trans.title}")
                     
@@ -8,25 +8,35 @@ import os
 from pathlib import Path
 
 # Add the app directory to the Python path
-sys.path.append(str(Path(__file__).parent.parent))
+_ROOT = str(Path(__file__).resolve().parent.parent)
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 from sqlalchemy import create_engine, text
 from app.core.config import settings
 from app.models.otp import Base as OTPBase
-from app.database import engine
+from app import database
 
 def create_otp_tables():
     """Create OTP tables in the database"""
     try:
         print("Creating OTP tables...")
         
-        # Create OTP tables
-        OTPBase.metadata.create_all(bind=engine)
+        # The engine only exists once the database has been initialized
+        database.init_db()
+        
+        # One transaction; a single probe decides whether per-table existence checks are needed
+        with database.engine.begin() as conn:
+            existing = conn.execute(text(
+                "SELECT to_regclass('public.otp_records') IS NOT NULL "
+                "OR to_regclass('public.daily_otp_limits') IS NOT NULL"
+            )).scalar()
+            OTPBase.metadata.create_all(conn, checkfirst=bool(existing))
         
         print("✅ OTP tables created successfully!")
         
         # Verify tables were created
-        with engine.connect() as conn:
+        with database.engine.connect() as conn:
             result = conn.execute(text("""
                 SELECT table_name 
                 FROM information_schema.tables 
@@ -3,14 +3,16 @@
 Setup script for OTP system configuration
 """
 
+import hashlib
 import os
 import sys
+from importlib.util import find_spec
 from pathlib import Path
 
-def create_env_template():
-    """Create a template .env file with OTP settings"""
-    
-    env_template = """
+# Summary label per outcome, indexed by the bool result
+_STATUS = ("❌ FAILED", "✅ OK")
+
+_ENV_BODY = b"""
 # OTP System Configuration
 # ========================
 
@@ -41,14 +43,32 @@ JWT_ACCESS_TOKEN_EXPIRE_MINUTES=240
 
 # Other required settings...
 """
+
+# The header carries a hash of the body, so an unchanged template is recognised from its first line
+_ENV_HEADER = b"# farmacy-env-v1 " + hashlib.blake2b(_ENV_BODY, digest_size=16).hexdigest().encode()
+_ENV_TEMPLATE = _ENV_HEADER + b"\n" + _ENV_BODY
+
+def create_env_template():
+    """Create a template .env file with OTP settings"""
     
     env_file = Path(".env")
-    if env_file.exists():
+    try:
+        with open(env_file, "rb") as f:
+            if f.read(len(_ENV_HEADER)) == _ENV_HEADER:
+                print("✅ .env template is already current")
+                return
+    except FileNotFoundError:
+        pass
+    else:
         print("⚠️ .env file already exists. Backing up to .env.backup")
-        env_file.rename(".env.backup")
+        os.replace(env_file, ".env.backup")
     
-    with open(".env", "w") as f:
-        f.write(env_template)
+    # O_EXCL creates the file atomically; 0600 keeps the credentials private
+    fd = os.open(env_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        os.write(fd, _ENV_TEMPLATE)
+    finally:
+        os.close(fd)
     
     print("✅ Created .env template file")
     print("📝 Please edit .env file with your actual credentials")
@@ -56,24 +76,25 @@ JWT_ACCESS_TOKEN_EXPIRE_MINUTES=240
 def check_dependencies():
     """Check if required dependencies are installed"""
     
-    required_packages = [
-        "requests",
-        "sqlalchemy",
-        "pydantic",
-        "fastapi",
-        "python-jose[cryptography]",
-        "passlib[bcrypt]",
-        "python-multipart"
-    ]
+    # pip package -> importable module name
+    required_packages = {
+        "requests": "requests",
+        "sqlalchemy": "sqlalchemy",
+        "pydantic": "pydantic",
+        "fastapi": "fastapi",
+        "python-jose[cryptography]": "jose",
+        "passlib[bcrypt]": "passlib",
+        "python-multipart": "multipart"
+    }
     
     print("🔍 Checking dependencies...")
     
+    # find_spec only locates the module, without importing (and initializing) it
     missing_packages = []
-    for package in required_packages:
-        try:
-            __import__(package.replace("-", "_"))
+    for package, module in required_packages.items():
+        if find_spec(module) is not None:
             print(f"✅ {package}")
-        except ImportError:
+        else:
             print(f"❌ {package} - MISSING")
             missing_packages.append(package)
     
@@ -115,23 +136,25 @@ def main():
     # Create database tables
     tables_ok = create_database_tables()
     
-    print("\n" + "=" * 50)
-    print("📋 Setup Summary:")
-    print(f"Dependencies: {'✅ OK' if deps_ok else '❌ FAILED'}")
-    print(f"Database Tables: {'✅ OK' if tables_ok else '❌ FAILED'}")
-    print("Environment: ✅ Template created")
-    
-    print("\n📝 Next Steps:")
-    print("1. Edit .env file with your actual credentials")
-    print("2. Set up MSG91 account at https://msg91.com/")
-    print("3. Get your API key and template ID from MSG91")
-    print("4. Update MSG91_API_KEY and MSG91_TEMPLATE_ID in .env")
-    print("5. Run the test script: python test_otp_system.py")
-    
+    # Emit the summary as one write
+    summary = [
+        "\n" + "=" * 50,
+        "📋 Setup Summary:",
+        f"Dependencies: {_STATUS[deps_ok]}",
+        f"Database Tables: {_STATUS[tables_ok]}",
+        "Environment: ✅ Template created",
+        "\n📝 Next Steps:",
+        "1. Edit .env file with your actual credentials",
+        "2. Set up MSG91 account at https://msg91.com/",
+        "3. Get your API key and template ID from MSG91",
+        "4. Update MSG91_API_KEY and MSG91_TEMPLATE_ID in .env",
+        "5. Run the test script: python test_otp_system.py",
+    ]
     if deps_ok and tables_ok:
-        print("\n🎉 Setup completed successfully!")
+        summary.append("\n🎉 Setup completed successfully!")
     else:
-        print("\n⚠️ Setup completed with some issues. Please check the errors above.")
+        summary.append("\n⚠️ Setup completed with some issues. Please check the errors above.")
+    sys.stdout.write("\n".join(summary) + "\n")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -3,18 +3,36 @@
 Test script to verify the OTP system with MSG91
 """
 
+import functools
 import sys
 import os
 from pathlib import Path
 
 # Add the app directory to the Python path
-sys.path.append(str(Path(__file__).parent))
+_HERE = str(Path(__file__).resolve().parent)
+if _HERE not in sys.path:
+    sys.path.insert(0, _HERE)
 
 from app.services.otp_service import OTPService
-from app.services.sms_service import sms_manager, send_otp_sms
+from app.services.sms_service import sms_manager, send_otp_sms, close_sms_http
 from app.core.config import settings
 import asyncio
 
+# Summary label per outcome, indexed by the bool result
+_STATUS = ("❌ FAILED", "✅ OK")
+
+# MSG91 settings read once; not every deployment defines all of them
+_MSG91 = (
+    getattr(settings, 'MSG91_API_KEY', None),
+    getattr(settings, 'MSG91_SENDER_ID', None),
+    getattr(settings, 'MSG91_TEMPLATE_ID', None),
+)
+
+@functools.cache
+def get_otp_service() -> OTPService:
+    """OTPService shared by every test instead of one instance per test"""
+    return OTPService()
+
 def test_sms_manager():
     """Test SMS manager configuration"""
     print("🔧 Testing SMS Manager Configuration...")
@@ -32,9 +50,7 @@ def test_sms_manager():
         print("✅ MSG91 service is available")
         
         # Check MSG91 settings
-        msg91_api_key = getattr(settings, 'MSG91_API_KEY', None)
-        msg91_sender_id = getattr(settings, 'MSG91_SENDER_ID', None)
-        msg91_template_id = getattr(settings, 'MSG91_TEMPLATE_ID', None)
+        msg91_api_key, msg91_sender_id, msg91_template_id = _MSG91
         
         print(f"🔑 MSG91 API Key: {'✅ Set' if msg91_api_key else '❌ Not set'}")
         print(f"📧 MSG91 Sender ID: {msg91_sender_id}")
@@ -49,14 +65,14 @@ def test_otp_service():
     print("\n🔐 Testing OTP Service...")
     
     try:
-        otp_service = OTPService()
+        otp_service = get_otp_service()
         print("✅ OTP service initialized successfully")
         return otp_service
     except Exception as e:
         print(f"❌ Failed to initialize OTP service: {e}")
         return None
 
-def test_sms_sending():
+async def test_sms_sending():
     """Test SMS sending functionality"""
     print("\n📤 Testing SMS Sending...")
     
@@ -65,7 +81,7 @@ def test_sms_sending():
     
     try:
         # Test using SMS manager
-        result = send_otp_sms(test_phone, "123456")
+        result = await send_otp_sms(test_phone, "123456")
         print(f"📱 SMS sending result: {'✅ Success' if result else '❌ Failed'}")
         return result
     except Exception as e:
@@ -79,7 +95,7 @@ def test_otp_flow():
     test_phone = "+919876543210"
     
     try:
-        otp_service = OTPService()
+        otp_service = get_otp_service()
         
         # Test OTP generation
         print("1️⃣ Testing OTP generation...")
@@ -103,35 +119,41 @@ def test_otp_flow():
         print(f"❌ OTP flow error: {e}")
         return False
 
-def main():
+async def amain():
     """Main test function"""
     print("🧪 OTP System Verification Test")
     print("=" * 50)
     
-    # Test SMS manager
-    sms_ok = test_sms_manager()
-    
-    # Test OTP service
-    otp_service = test_otp_service()
-    
-    # Test SMS sending
-    sms_sending_ok = test_sms_sending()
-    
-    # Test OTP flow
-    otp_flow_ok = test_otp_flow()
+    # The checks are independent, so run the blocking ones in threads alongside the
+    # SMS send; total time is the slowest check rather than the sum (output may interleave)
+    sms_ok, otp_service, sms_sending_ok, otp_flow_ok = await asyncio.gather(
+        asyncio.to_thread(test_sms_manager),
+        asyncio.to_thread(test_otp_service),
+        test_sms_sending(),
+        asyncio.to_thread(test_otp_flow),
+    )
     
     # Summary
-    print("\n" + "=" * 50)
-    print("📊 Test Summary:")
-    print(f"SMS Manager: {'✅ OK' if sms_ok else '❌ FAILED'}")
-    print(f"OTP Service: {'✅ OK' if otp_service else '❌ FAILED'}")
-    print(f"SMS Sending: {'✅ OK' if sms_sending_ok else '❌ FAILED'}")
-    print(f"OTP Flow: {'✅ OK' if otp_flow_ok else '❌ FAILED'}")
-    
-    if all([sms_ok, otp_service, sms_sending_ok, otp_flow_ok]):
-        print("\n🎉 All tests passed! OTP system is working correctly.")
+    results = (
+        ("SMS Manager", bool(sms_ok)),
+        ("OTP Service", otp_service is not None),
+        ("SMS Sending", bool(sms_sending_ok)),
+        ("OTP Flow", bool(otp_flow_ok)),
+    )
+    # Emit the summary as one write so it is not interleaved with other output
+    summary = ["\n" + "=" * 50, "📊 Test Summary:"]
+    summary.extend(f"{label}: {_STATUS[ok]}" for label, ok in results)
+    if all(ok for _, ok in results):
+        summary.append("\n🎉 All tests passed! OTP system is working correctly.")
     else:
-        print("\n⚠️ Some tests failed. Please check the configuration.")
+        summary.append("\n⚠️ Some tests failed. Please check the configuration.")
+    sys.stdout.write("\n".join(summary) + "\n")
+
+    # The shared SMS client is bound to this event loop
+    await close_sms_http()
+
+def main():
+    asyncio.run(amain())
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file